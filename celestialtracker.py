@@ -1,66 +1,357 @@
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
 from skyfield.api import load, wgs84
 from skyfield import almanac
-from math import cos, degrees, atan2
+from skyfield.framelib import ecliptic_frame
+from skyfield.timelib import Time
+import threading
+import json
+import os
+import numpy as np
+
+MOON_RADIUS_KM = 1737.4
+MOON_MEAN_DIAMETER_DEG = 0.5181  # in degrees
+
+
+class SkyfieldRegistry:
+    """Process-wide cache of the timescale, ephemeris and per-location observers.
+
+    Loading de421.bsp is by far the most expensive part of building a tracker,
+    so it happens once (lazily, on first use) and every tracker shares it.
+    """
+
+    def __init__(self, ephemeris_file: str = 'de421.bsp'):
+        self.ephemeris_file = ephemeris_file
+        self._lock = threading.Lock()
+        self._ts = None
+        self._eph = None
+        self._topos = {}
+        self._observers = {}
+
+    def _ensure_loaded(self):
+        if self._eph is not None:
+            return
+        with self._lock:
+            if self._eph is None:
+                self._ts = load.timescale()
+                self._eph = load(self.ephemeris_file)
+
+    @property
+    def ts(self):
+        self._ensure_loaded()
+        return self._ts
+
+    @property
+    def eph(self):
+        self._ensure_loaded()
+        return self._eph
+
+    def topos(self, latitude: float, longitude: float, elevation_m: float = 0):
+        key = (latitude, longitude, elevation_m)
+        topos = self._topos.get(key)
+        if topos is None:
+            with self._lock:
+                topos = self._topos.get(key)
+                if topos is None:
+                    topos = wgs84.latlon(
+                        latitude_degrees=latitude,
+                        longitude_degrees=longitude,
+                        elevation_m=elevation_m
+                    )
+                    self._topos[key] = topos
+        return topos
+
+    def observer(self, latitude: float, longitude: float, elevation_m: float = 0):
+        key = (latitude, longitude, elevation_m)
+        observer = self._observers.get(key)
+        if observer is None:
+            topos = self.topos(latitude, longitude, elevation_m)
+            earth = self.eph['earth']
+            with self._lock:
+                observer = self._observers.setdefault(key, earth + topos)
+        return observer
+
+
+_registry = SkyfieldRegistry()
+
+def get_registry() -> SkyfieldRegistry:
+    return _registry
+
+
+TWILIGHT_DAWN = {1: 'astronomical_dawn', 2: 'nautical_dawn', 3: 'civil_dawn'}
+TWILIGHT_DUSK = {2: 'civil_dusk', 1: 'nautical_dusk', 0: 'astronomical_dusk'}
+MOON_HORIZON_DEGREES = 0.0  # moonrise/moonset horizon the cache is computed for, same as moon_rise_set's default
+ALMANAC_CACHE_VERSION = 2  # bump when the stored events change meaning, older cache files are discarded
+
+
+class AlmanacCache:
+    """
+    Rise, set, transit, twilight and moon phase events, precomputed per location
+    and UTC date for a rolling window of days.
+
+    Each miss computes the whole window with one find_discrete pass per event
+    type, so most lookups are dictionary hits. Days before yesterday are evicted
+    as time moves on, and the cache is persisted to cache_file so a restart
+    starts warm. Event times are stored as UTC epoch seconds.
+
+    The shared lock only guards the dict itself. A miss is computed under a
+    per-location lock, so one new spot's first lookup never holds up hits for
+    the others, and two misses for the same spot only compute it once.
+    """
+
+    def __init__(self, cache_file: str = 'almanac.json', window_days: int = 3, registry: SkyfieldRegistry = None):
+        self.cache_file = cache_file
+        self.window_days = window_days
+        self.registry = registry if registry is not None else get_registry()
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self._location_locks = {}
+        self._days = None  # {location key: {iso date: {event: [epoch seconds]}}}
+
+    @staticmethod
+    def _location_key(latitude, longitude, elevation_m):
+        return f"{latitude:.5f},{longitude:.5f},{elevation_m:.1f}"
+
+    def _load(self):
+        if self._days is not None:
+            return
+        self._days = {}
+        if os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, 'r') as f:
+                    cached = json.load(f)
+                if cached.get("version") == ALMANAC_CACHE_VERSION:
+                    self._days = cached["days"]
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable almanac cache: {e}")
+
+    def _save(self):
+        with self._lock:
+            text = json.dumps({"version": ALMANAC_CACHE_VERSION, "days": self._days})
+        tmp = self.cache_file + '.tmp'
+        with self._save_lock:
+            with open(tmp, 'w') as f:
+                f.write(text)
+            os.replace(tmp, self.cache_file)
+
+    def _evict(self):
+        cutoff = (datetime.now(timezone.utc).date() - timedelta(days=1)).isoformat()
+        for days in self._days.values():
+            for key in [k for k in days if k < cutoff]:
+                del days[key]
+
+    def _compute(self, latitude, longitude, elevation_m, start: date):
+        ts = self.registry.ts
+        eph = self.registry.eph
+        topos = self.registry.topos(latitude, longitude, elevation_m)
+
+        t0 = ts.utc(start.year, start.month, start.day)
+        t1 = ts.utc(start.year, start.month, start.day + self.window_days)
+
+        days = {(start + timedelta(days=i)).isoformat(): {} for i in range(self.window_days)}
+
+        def add(name, t):
+            dt = t.utc_datetime()
+            day = days.get(dt.date().isoformat())
+            if day is not None:
+                day.setdefault(name, []).append(dt.timestamp())
+
+        searches = [
+            (almanac.sunrise_sunset(eph, topos), {1: 'sunrise', 0: 'sunset'}),
+            (almanac.meridian_transits(eph, eph['sun'], topos), {1: 'sun_transit'}),
+            (almanac.risings_and_settings(eph, eph['moon'], topos, horizon_degrees=MOON_HORIZON_DEGREES),
+             {1: 'moonrise', 0: 'moonset'}),
+            (almanac.meridian_transits(eph, eph['moon'], topos), {1: 'moon_transit'}),
+            (almanac.moon_phases(eph), {i: name.lower().replace(' ', '_') for i, name in enumerate(almanac.MOON_PHASES)}),
+        ]
+        for f, names in searches:
+            times, events = almanac.find_discrete(t0, t1, f)
+            for t, e in zip(times, events):
+                if int(e) in names:
+                    add(names[int(e)], t)
+
+        f = almanac.dark_twilight_day(eph, topos)
+        times, events = almanac.find_discrete(t0, t1, f)
+        previous = int(f(t0))
+        for t, e in zip(times, events):
+            e = int(e)
+            name = TWILIGHT_DAWN.get(e) if e > previous else TWILIGHT_DUSK.get(e)
+            if name is not None:
+                add(name, t)
+            previous = e
+
+        return days
+
+    def day(self, day: date, latitude: float = 53.29395, longitude: float = -6.13586, elevation_m: float = 0) -> dict:
+        """All events on a UTC date, as {event name: [utc datetimes]}."""
+        key = self._location_key(latitude, longitude, elevation_m)
+        with self._lock:
+            self._load()
+            events = self._days.get(key, {}).get(day.isoformat())
+            location_lock = self._location_locks.setdefault(key, threading.Lock())
+
+        if events is None:
+            with location_lock:
+                with self._lock:
+                    events = self._days.get(key, {}).get(day.isoformat())  # computed while we waited?
+                if events is None:
+                    computed = self._compute(latitude, longitude, elevation_m, day)
+                    events = computed[day.isoformat()]
+                    with self._lock:
+                        self._days.setdefault(key, {}).update(computed)
+                        self._evict()
+                    try:
+                        self._save()
+                    except OSError as e:
+                        print(f"Failed to write almanac cache: {e}")
+
+        return {
+            name: [datetime.fromtimestamp(ts, tz=timezone.utc) for ts in times]
+            for name, times in events.items()
+        }
+
+    def forget(self, latitude: float, longitude: float, elevation_m: float = 0):
+        """Drop a location's days from the cache."""
+        key = self._location_key(latitude, longitude, elevation_m)
+        with self._lock:
+            self._load()
+            self._days.pop(key, None)
+            self._location_locks.pop(key, None)
+
+    def event(self, name: str, day: date, **location):
+        """First occurrence of an event on a UTC date, or None."""
+        times = self.day(day, **location).get(name)
+        return times[0] if times else None
+
+    def next_event(self, name: str, after: datetime, within: timedelta = timedelta(days=1), **location):
+        """First occurrence of an event strictly after `after` and within `within` of it, or None."""
+        end = after + within
+        day = after.astimezone(timezone.utc).date()
+        while datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc) <= end:
+            for t in self.day(day, **location).get(name, []):
+                if after < t <= end:
+                    return t
+            day += timedelta(days=1)
+        return None
+
+
+_almanac = AlmanacCache()
+
+def get_almanac() -> AlmanacCache:
+    return _almanac
+
+
+def to_time(ts, times=None):
+    """Skyfield Time from a datetime, a list of datetimes, a datetime64 array (UTC) or a Time (default now)."""
+    if times is None:
+        times = datetime.now(timezone.utc)
+    if isinstance(times, Time):
+        return times
+    if isinstance(times, datetime):
+        if times.tzinfo is None:
+            raise ValueError("Datetime must be timezone-aware (e.g., in UTC)")
+        return ts.from_datetime(times)
+
+    arr = np.asarray(times)
+    if np.issubdtype(arr.dtype, np.datetime64):
+        # calendar fields rather than seconds since 1970, so ts.utc applies leap seconds
+        arr = arr.astype('datetime64[ns]')
+        days = arr.astype('datetime64[D]')
+        months = days.astype('datetime64[M]')
+        year = months.astype('datetime64[Y]').astype(int) + 1970
+        month = months.astype(int) % 12 + 1
+        day = (days - months).astype(int) + 1
+        seconds = (arr - days) / np.timedelta64(1, 's')
+        return ts.utc(year, month, day, 0, 0, seconds)
+    if any(t.tzinfo is None for t in times):
+        raise ValueError("Datetime must be timezone-aware (e.g., in UTC)")
+    return ts.from_datetimes(list(times))
+
 
 class CelestialTracker:
     def __init__(self, latitude: float = 53.29395, longitude: float = -6.13586, elevation_m: float = 0):
         self.latitude = latitude
         self.longitude = longitude
         self.elevation_m = elevation_m
-        self.ts = load.timescale()
-        self.eph = load('de421.bsp')
+        self.registry = get_registry()
+        self.ts = self.registry.ts
+        self.eph = self.registry.eph
         self.earth = self.eph['earth']
         self.sun = self.eph['sun']
         self.moon = self.eph['moon']
 
     def _get_observer(self):
-        return self.earth + self._get_topos()
+        return self.registry.observer(self.latitude, self.longitude, self.elevation_m)
     
     def _get_topos(self):
-        return wgs84.latlon(
-            latitude_degrees=self.latitude,
-            longitude_degrees=self.longitude,
-            elevation_m=self.elevation_m
-        )
+        return self.registry.topos(self.latitude, self.longitude, self.elevation_m)
 
-    def generic_alt_az(self, body, dt: datetime=None):
-        if dt is None:
-            dt = datetime.now(timezone.utc)
-        elif dt.tzinfo is None:
-            raise ValueError("Datetime must be timezone-aware (e.g., in UTC)")
+    def _location(self):
+        return {"latitude": self.latitude, "longitude": self.longitude, "elevation_m": self.elevation_m}
+
+    def sun_rise_set(self, dt: datetime = None):
+        """Sunrise and sunset on the UTC date of dt (default today), from the almanac cache."""
+        dt = dt if dt is not None else datetime.now(timezone.utc)
+        events = get_almanac().day(dt.astimezone(timezone.utc).date(), **self._location())
+        sunrise = events.get('sunrise', [None])[0]
+        sunset = events.get('sunset', [None])[0]
+        return sunrise, sunset
+
+    def _to_time(self, times=None):
+        return to_time(self.ts, times)
+
+    def positions(self, times=None):
+        """
+        Sun and moon positions for one or many instants from a single apparent-position pass.
+
+        times can be anything _to_time accepts. Returns a dict of NumPy arrays
+        (0-d for a single instant): moon/sun altitude, azimuth and distance, the
+        moon's angular diameter and % of average size, its phase angle (°, from
+        ecliptic longitude as seen by the observer) and illuminated fraction.
+        """
+        t = self._to_time(times)
+        observer = self._get_observer().at(t)
+        moon = observer.observe(self.moon).apparent()
+        sun = observer.observe(self.sun).apparent()
+
+        moon_alt, moon_az, moon_dist = moon.altaz()
+        sun_alt, sun_az, sun_dist = sun.altaz()
+
+        diameter_deg = np.degrees(2 * np.arctan2(MOON_RADIUS_KM, moon_dist.km))
+
+        _, moon_lon, _ = moon.frame_latlon(ecliptic_frame)
+        _, sun_lon, _ = sun.frame_latlon(ecliptic_frame)
+        phase = (moon_lon.degrees - sun_lon.degrees) % 360.0
+
+        return {
+            "moon_alt": moon_alt.degrees,
+            "moon_az": moon_az.degrees,
+            "moon_distance_km": moon_dist.km,
+            "moon_diameter_deg": diameter_deg,
+            "moon_size_pct": diameter_deg / MOON_MEAN_DIAMETER_DEG * 100,
+            "sun_alt": sun_alt.degrees,
+            "sun_az": sun_az.degrees,
+            "sun_distance_km": sun_dist.km,
+            "phase_angle": phase,
+            "illumination": 0.5 * (1 - np.cos(np.radians(phase))),
+        }
 
-        t = self.ts.from_datetime(dt)
-        observer = self._get_observer()
-        astrometric = observer.at(t).observe(body).apparent()
+    def generic_alt_az(self, body, dt: datetime=None):
+        t = self._to_time(dt)
+        astrometric = self._get_observer().at(t).observe(body).apparent()
         alt, az, _ = astrometric.altaz()
         return alt.degrees, az.degrees
 
     def sun_at(self, dt: datetime=None):
-        return self.generic_alt_az(self.sun, dt)
+        p = self.positions(dt)
+        return float(p["sun_alt"]), float(p["sun_az"])
 
     def moon_at(self, dt: datetime=None):
-        return self.generic_alt_az(self.moon, dt)
+        p = self.positions(dt)
+        return float(p["moon_alt"]), float(p["moon_az"])
 
     def moon_angular_diameter_pct(self, dt: datetime = None):
-        if dt is None:
-            dt = datetime.now(timezone.utc)
-        elif dt.tzinfo is None:
-            raise ValueError("Datetime must be timezone-aware (e.g., in UTC)")
-        
-        MOON_RADIUS_KM = 1737.4
-        MOON_MEAN_DIAMETER_DEG = 0.5181  # in degrees
-
-        t = self.ts.from_datetime(dt)
-        observer = self._get_observer()
-        astrometric = observer.at(t).observe(self.moon).apparent()
-        _, _, distance = astrometric.altaz()
-        distance_km = distance.km
-
-        # Angular diameter in degrees
-        diameter_deg = degrees(2 * atan2(MOON_RADIUS_KM, distance_km))
-        percent_of_average = (diameter_deg / MOON_MEAN_DIAMETER_DEG) * 100
-        return diameter_deg, percent_of_average
+        p = self.positions(dt)
+        return float(p["moon_diameter_deg"]), float(p["moon_size_pct"])
     
     def moon_rise_set(self, dt: datetime = None, horizon_degrees: float = 0.0):
         if dt is None:
@@ -68,6 +359,12 @@ class CelestialTracker:
         elif dt.tzinfo is None:
             raise ValueError("Datetime must be timezone-aware (e.g., in UTC)")
 
+        if horizon_degrees == MOON_HORIZON_DEGREES:
+            location = self._location()
+            rise_time = get_almanac().next_event('moonrise', dt, **location)
+            set_time = get_almanac().next_event('moonset', dt, **location)
+            return rise_time, set_time
+
         ts = self.ts
         eph = self.eph
 
@@ -98,17 +395,8 @@ class CelestialTracker:
         Returns the moon phase angle in degrees at a specific datetime.
         0° = New Moon, 90° = First Quarter, 180° = Full Moon, 270° = Last Quarter
         """
-        if dt is None:
-            dt = datetime.now(timezone.utc)
-        elif dt.tzinfo is None:
-            raise ValueError("Datetime must be timezone-aware (e.g., in UTC)")
-
-        t = self.ts.from_datetime(dt)
-        phase_angle = almanac.moon_phase(self.eph, t)
-
-        illumination = 0.5 * (1 - cos(phase_angle.radians))
-
-        return phase_angle.degrees, illumination
+        p = self.positions(dt)
+        return float(p["phase_angle"]), float(p["illumination"])
 
     def moon_phase_name(self, phase_angle: float) -> str:
         """Returns a rough moon phase name based on angle. (might be generous with the full moon status)"""
@@ -134,92 +422,110 @@ class SunArcTimer():
         self.latitude = latitude
         self.longitude = longitude
         self.arc_deg = arc_deg
-        self.ts = load.timescale()
-        self.eph = load('de421.bsp')
+        self.registry = get_registry()
+        self.ts = self.registry.ts
+        self.eph = self.registry.eph
         self.earth = self.eph['earth']
         self.sun = self.eph['sun']
-        self.location = wgs84.latlon(latitude, longitude)
+        self.location = self.registry.topos(latitude, longitude)
+        self.observer = self.registry.observer(latitude, longitude)
 
     def _get_altitude(self, t):
-        astrometric = self.earth + self.location
-        alt, _, _ = astrometric.at(t).observe(self.sun).apparent().altaz()
+        """Sun altitude (°) at t, which may be a scalar Time or a Time array."""
+        alt, _, _ = self.observer.at(t).observe(self.sun).apparent().altaz()
         return alt.degrees
-    
-    def _sunset_time(self):
-        now = datetime.now(timezone.utc)
-        t0 = self.ts.utc(now.year, now.month, now.day)
-        t1 = self.ts.utc((now + timedelta(days=1)).year, 
-                         (now + timedelta(days=1)).month, 
-                         (now + timedelta(days=1)).day)
 
-        f = almanac.sunrise_sunset(self.eph, self.location)
-        times, events = almanac.find_discrete(t0, t1, f)
+    def _sunset_time(self, dt: datetime = None):
+        dt = dt if dt is not None else datetime.now(timezone.utc)
+        return get_almanac().event(
+            'sunset', dt.astimezone(timezone.utc).date(),
+            latitude=self.latitude, longitude=self.longitude
+        )
 
-        for t, e in zip(times, events):
-            if e == 0:  # 0 = sunset
-                return t.utc_datetime()
+    def find_crossings(self, targets, after_utc, until_utc=None, step_minutes=10, tolerance_sec=1.0):
+        """
+        Find the UTC times when the Sun sinks through each altitude in targets (°).
+
+        The altitude curve is sampled once on a coarse grid (a single vectorised
+        Skyfield call) to bracket every crossing, then all brackets are bisected
+        together, so each iteration is one more vectorised evaluation.
+        Returns a list aligned with targets, with None where there is no crossing
+        between after_utc and until_utc (default: today's sunset).
+        """
+        if until_utc is None:
+            until_utc = self._sunset_time(after_utc)
+            if until_utc is None:
+                return [None] * len(targets)
+        if until_utc <= after_utc:
+            return [None] * len(targets)
+
+        t0 = self.ts.from_datetime(after_utc)
+        span_sec = (until_utc - after_utc).total_seconds()
+        n = max(2, int(np.ceil(span_sec / (step_minutes * 60))) + 1)
+        offsets = np.linspace(0, span_sec, n)
+
+        def at(offsets_sec):
+            return self._get_altitude(self.ts.tt_jd(t0.tt + np.asarray(offsets_sec) / 86400))
+
+        alts = at(offsets)
+        targets = np.asarray(targets, dtype=float)
+
+        # first descending crossing of each target on the grid
+        lo = np.full(len(targets), np.nan)
+        hi = np.full(len(targets), np.nan)
+        for k, target in enumerate(targets):
+            idx = np.nonzero((alts[:-1] >= target) & (alts[1:] < target))[0]
+            if len(idx):
+                lo[k] = offsets[idx[0]]
+                hi[k] = offsets[idx[0] + 1]
+
+        found = ~np.isnan(lo)
+        if found.any():
+            lo_f, hi_f, tgt = lo[found], hi[found], targets[found]
+            iterations = int(np.ceil(np.log2(max(offsets[1] / tolerance_sec, 1))))
+            for _ in range(iterations):
+                mid = (lo_f + hi_f) / 2
+                above = at(mid) >= tgt
+                lo_f = np.where(above, mid, lo_f)
+                hi_f = np.where(above, hi_f, mid)
+            lo[found] = (lo_f + hi_f) / 2
+
+        return [after_utc + timedelta(seconds=float(sec)) if not np.isnan(sec) else None for sec in lo]
 
-        return None
-    
     def find_time_of_altitude(self, target_alt, after_utc):
         """Find the UTC time when the Sun crosses down through target_alt (°)."""
-        step_sec = 30
-        now = after_utc
-        prev_alt = self._get_altitude(self.ts.from_datetime(now))
+        return self.find_crossings([target_alt], after_utc)[0]
 
-        # Keep stepping until sunset or we find a crossing
-        sunset = self._sunset_time()
-        if not sunset:
-            return None
-
-        while now < sunset:
-            future = now + timedelta(seconds=step_sec)
-            alt = self._get_altitude(self.ts.from_datetime(future))
-            print(f"checking at {future} -> {alt}")
-
-
-            if prev_alt >= target_alt and alt <= target_alt:
-                # Linear interpolation between time steps
-                ratio = (prev_alt - target_alt) / (prev_alt - alt)
-                crossing_time = now + timedelta(seconds=step_sec * ratio)
-                return crossing_time
-
-            now = future
-            prev_alt = alt
-
-        return None
+    def hand_crossings(self, after_utc: datetime = None, hands_above: int = None):
+        """
+        Every handwidth crossing left before sunset, in one pass.
+        Returns a list of (altitude, utc datetime), highest first, ending at the horizon.
+        """
+        after_utc = after_utc if after_utc is not None else datetime.now(timezone.utc)
+        if hands_above is None:
+            start_alt = self._get_altitude(self.ts.from_datetime(after_utc))
+            hands_above = max(int(start_alt // self.arc_deg), 0)
 
+        altitudes = [self.arc_deg * h for h in range(hands_above, -1, -1)]
+        times = self.find_crossings(altitudes, after_utc)
+        return [(alt, t) for alt, t in zip(altitudes, times) if t is not None]
 
     def minutes_per_hand_near_sunset(self, hands_above=2):
-        now = datetime.now(timezone.utc)
-
-        segments = []
-        current_alt = self.arc_deg * hands_above
-
-        time_at_current = self.find_time_of_altitude(current_alt, now)
-        if not time_at_current:
+        crossings = self.hand_crossings(hands_above=hands_above)
+        if len(crossings) != hands_above + 1:
             return None
 
-        # Step down in hand-widths
-        for h in range(hands_above, 0, -1):
-            next_alt = self.arc_deg * (h - 1)
-            time_at_next = self.find_time_of_altitude(next_alt, time_at_current + timedelta(seconds=10))
-            if not time_at_next:
-                return None
-
-            delta_min = (time_at_next - time_at_current).total_seconds() / 60
-            segments.append(delta_min)
-
-            time_at_current = time_at_next  # move to next step
-
+        segments = [
+            (t_next - t_current).total_seconds() / 60
+            for (_, t_current), (_, t_next) in zip(crossings, crossings[1:])
+        ]
         average = sum(segments) / len(segments)
 
         return average, segments
 
-    def time_until_sun_drops_arc(self, max_minutes=180, step_seconds=30):
+    def time_until_sun_drops_arc(self, max_minutes=180, tolerance_sec=1.0):
         now = datetime.now(timezone.utc)
-        t_now = self.ts.from_datetime(now)
-        start_alt = self._get_altitude(t_now)
+        start_alt = self._get_altitude(self.ts.from_datetime(now))
 
         if start_alt <= 0:
             return 0, start_alt  # Sun is below horizon
@@ -229,16 +535,13 @@ class SunArcTimer():
         if target_alt <= 0:
             target_alt = 0  # Don't go below horizon
 
-        # Step forward until altitude is equal or lower
-        for i in range(1, int((max_minutes * 60) / step_seconds)):
-            future_time = now + timedelta(seconds=i * step_seconds)
-            t_future = self.ts.from_datetime(future_time)
-            alt = self._get_altitude(t_future)
-            if alt <= target_alt:
-                elapsed = (future_time - now).total_seconds() / 60
-                return elapsed, start_alt
+        crossing = self.find_crossings(
+            [target_alt], now, now + timedelta(minutes=max_minutes), tolerance_sec=tolerance_sec
+        )[0]
+        if crossing is None:
+            return None, start_alt  # Didn't drop arc_deg in max_minutes
 
-        return None, start_alt  # Didn't drop arc_deg in max_minutes
+        return (crossing - now).total_seconds() / 60, start_alt
 
 if __name__ == "__main__":
     ct = CelestialTracker()
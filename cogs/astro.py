@@ -1,14 +1,12 @@
 import math
-from datetime import datetime
+from datetime import datetime, timedelta
 import pytz
 import discord
 from discord import app_commands
 from discord.ext import commands
 
-from weather.weather import Weather
-from tides.tides import predict_tide
-from celestialtracker import CelestialTracker, SunArcTimer
-from discordBot import timestamp, create_embed, create_ws_embed, moon_info
+from services import forecast_service
+from discordBot import timestamp, create_embed, build_ws_embed, moon_info, IRELAND_TZ
 
 
 class Astro(commands.Cog):
@@ -17,13 +15,34 @@ class Astro(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    async def _check_location(self, interaction: discord.Interaction, location: str) -> bool:
+        try:
+            forecast_service.location(location)
+            return True
+        except KeyError as e:
+            await interaction.response.send_message(e.args[0], ephemeral=True)
+            return False
+
+    async def location_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [
+            app_commands.Choice(name=name, value=name)
+            for name in forecast_service.locations.names()
+            if current.lower() in name.lower()
+        ][:25]
+
     @app_commands.command(name="sunset", description="Show today's sunset time in UTC.")
     async def sunset(self, interaction: discord.Interaction):
-        await interaction.response.send_message(f'Sunset at {timestamp(Weather().sunset())}')
+        await interaction.response.defer()
+        await interaction.followup.send(f'Sunset at {timestamp(await forecast_service.sunset())}')
 
     @app_commands.command(name="weather", description="Get the current weather forecast.")
-    async def weather(self, interaction: discord.Interaction):
-        forecast = Weather().weather_now()
+    @app_commands.describe(location="Location (default Dun Laoghaire).")
+    @app_commands.autocomplete(location=location_autocomplete)
+    async def weather(self, interaction: discord.Interaction, location: str = None):
+        if not await self._check_location(interaction, location):
+            return
+        await interaction.response.defer()
+        forecast = await forecast_service.weather_now(location)
         temp = forecast["temperature"]
         temp_margin = forecast["temp_margin"]
         feels_like = forecast["feels_like"]
@@ -33,7 +52,7 @@ class Astro(commands.Cog):
 
         embed = create_embed(f"🌤️ Weather Forecast")
         embed.add_field(
-            name=f"Dun Laoghaire",
+            name=forecast_service.location(location).location.name,
             value=(
                 f"Temperature: `{temp:.2f}±{temp_margin:.2f} °C` (feels like `{feels_like:.2f} °C`)\n"
                 f"Weather: `{weather_desc}`\n"
@@ -42,16 +61,51 @@ class Astro(commands.Cog):
             ),
             inline=False
         )
-        await interaction.response.send_message(embed=embed)
+        await interaction.followup.send(embed=embed)
 
-    @app_commands.command(name="tide", description="Get the current tide prediction for Dun Laoghaire.")
-    async def tide(self, interaction: discord.Interaction):
+    @app_commands.command(name="tide", description="Get the current tide prediction.")
+    @app_commands.describe(location="Location (default Dun Laoghaire).")
+    @app_commands.autocomplete(location=location_autocomplete)
+    async def tide(self, interaction: discord.Interaction, location: str = None):
+        if not await self._check_location(interaction, location):
+            return
+        await interaction.response.defer()
         now = datetime.now(pytz.utc)
-        await interaction.response.send_message(f"`{predict_tide(now)[0]:.2f}m` @ {timestamp(now)}")
+        await interaction.followup.send(f"`{await forecast_service.tide_at(now, location):.2f}m` @ {timestamp(now)}")
+
+    @app_commands.command(name="tides", description="High and low water times.")
+    @app_commands.describe(days="How many days to show, starting today (1-7).", location="Location (default Dun Laoghaire).")
+    @app_commands.autocomplete(location=location_autocomplete)
+    async def tides(self, interaction: discord.Interaction, days: app_commands.Range[int, 1, 7] = 1, location: str = None):
+        if not await self._check_location(interaction, location):
+            return
+        await interaction.response.defer()
+        today = datetime.now(IRELAND_TZ).date()
+
+        embed = create_embed(f"🌊 Tide Table - {forecast_service.location(location).location.name}")
+        for i in range(days):
+            day = today + timedelta(days=i)
+            events = await forecast_service.tide_table(day, location)
+            lines = [
+                f"{'High' if kind == 'high' else 'Low '} `{height:.2f}m` @ {timestamp(t)}"
+                for t, height, kind in events
+            ]
+            embed.add_field(
+                name=day.strftime("%A %d %B"),
+                value="\n".join(lines) if lines else "No data",
+                inline=False
+            )
+        await interaction.followup.send(embed=embed)
 
     @app_commands.command(name="moon", description="Get the current moon position and size.")
-    async def moon(self, interaction: discord.Interaction):
-        alt, az, perc, rise_set_str, phase, phase_name, illum = moon_info()
+    @app_commands.describe(location="Location (default Dun Laoghaire).")
+    @app_commands.autocomplete(location=location_autocomplete)
+    async def moon(self, interaction: discord.Interaction, location: str = None):
+        if not await self._check_location(interaction, location):
+            return
+        await interaction.response.defer()
+        tracker = forecast_service.location(location).tracker
+        alt, az, perc, rise_set_str, phase, phase_name, illum = await forecast_service.run(moon_info, None, tracker)
         embed = create_embed(f"🌙 Moon Info")
         embed.add_field(
             name=f"Details",
@@ -65,17 +119,22 @@ class Astro(commands.Cog):
             ),
             inline=False
         )
-        await interaction.response.send_message(embed=embed)
+        await interaction.followup.send(embed=embed)
 
     @app_commands.command(name="sun", description="Get the current sun position in the sky.")
     async def sun(self, interaction: discord.Interaction):
-        alt, az = CelestialTracker().sun_at()
-        await interaction.response.send_message(f"Sun Alt: `{alt:.1f}°`, Az: `{az:.1f}°`")
+        await interaction.response.defer()
+        alt, az = await forecast_service.sun_at()
+        await interaction.followup.send(f"Sun Alt: `{alt:.1f}°`, Az: `{az:.1f}°`")
 
     @app_commands.command(name="ws", description="Show tide, weather and moon near sunset.")
-    async def ws(self, interaction: discord.Interaction):
+    @app_commands.describe(location="Location (default Dun Laoghaire).")
+    @app_commands.autocomplete(location=location_autocomplete)
+    async def ws(self, interaction: discord.Interaction, location: str = None):
+        if not await self._check_location(interaction, location):
+            return
         await interaction.response.defer()  # avoid timeout
-        await interaction.followup.send(embed=create_ws_embed())
+        await interaction.followup.send(embed=await build_ws_embed(location))
 
     @app_commands.command(name="horizon", description="Calculate distance to the horizon from height.")
     @app_commands.describe(height="Your eye level or viewpoint height in meters.")
@@ -94,8 +153,9 @@ class Astro(commands.Cog):
 
     @app_commands.command(name="handtime", description="Time for the sun to move one handwidth.")
     async def handtime(self, interaction: discord.Interaction):
-        t, _ = SunArcTimer().minutes_per_hand_near_sunset()
-        await interaction.response.send_message(f"`{t:.1f}` minutes per handwidth (`7.149°`)")
+        await interaction.response.defer()
+        t, _ = await forecast_service.hand_time()
+        await interaction.followup.send(f"`{t:.1f}` minutes per handwidth (`7.149°`)")
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Astro(bot))
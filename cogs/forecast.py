@@ -0,0 +1,63 @@
+import re
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from services import forecast_service
+
+
+class Forecast(commands.Cog):
+    """Daily forecast subscription commands."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    async def location_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [
+            app_commands.Choice(name=name, value=name)
+            for name in forecast_service.locations.names()
+            if current.lower() in name.lower()
+        ][:25]
+
+    def _describe(self, user_id):
+        rows = self.bot.subscription_store.for_user(user_id)
+        if not rows:
+            return "You have no forecast subscriptions."
+        return "\n".join(f"{location} @ `{hour:02d}:{minute:02d}`" for location, hour, minute in rows)
+
+    @app_commands.command(name="subscribe", description="Get the evening forecast by DM every day.")
+    @app_commands.describe(
+        time="Delivery time, Irish time (HH:MM, default 13:00).",
+        location="Location (default Dun Laoghaire)."
+    )
+    @app_commands.autocomplete(location=location_autocomplete)
+    async def subscribe(self, interaction: discord.Interaction, time: str = "13:00", location: str = None):
+        match = re.fullmatch(r"(\d{1,2}):(\d{2})", time.strip())
+        if not match or int(match[1]) > 23 or int(match[2]) > 59:
+            await interaction.response.send_message(f"Time '{time}' not recognised, use HH:MM.", ephemeral=True)
+            return
+        try:
+            name = forecast_service.location(location).location.name
+        except KeyError as e:
+            await interaction.response.send_message(e.args[0], ephemeral=True)
+            return
+
+        self.bot.subscription_store.subscribe(interaction.user.id, int(match[1]), int(match[2]), name)
+        self.bot.forecast_scheduler.reschedule()
+        await interaction.response.send_message(
+            f"Subscribed!\n{self._describe(interaction.user.id)}", ephemeral=True
+        )
+
+    @app_commands.command(name="unsubscribe", description="Stop the daily forecast DM.")
+    @app_commands.describe(location="Only this location (default: all of them).")
+    @app_commands.autocomplete(location=location_autocomplete)
+    async def unsubscribe(self, interaction: discord.Interaction, location: str = None):
+        removed = self.bot.subscription_store.unsubscribe(interaction.user.id, location)
+        self.bot.forecast_scheduler.reschedule()
+        await interaction.response.send_message(
+            f"Removed {removed} subscription{'s' if removed != 1 else ''}.\n{self._describe(interaction.user.id)}",
+            ephemeral=True
+        )
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Forecast(bot))
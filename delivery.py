@@ -0,0 +1,70 @@
+import asyncio
+from collections import deque
+from time import perf_counter
+from datetime import datetime
+
+import pytz
+import discord
+
+
+class DeliveryResult:
+    def __init__(self, user_id, ok: bool, latency: float, error: str = None):
+        self.user_id = user_id
+        self.ok = ok
+        self.latency = latency  # seconds from start of the run until this DM was sent (or failed)
+        self.error = error
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"failed: {self.error}"
+        return f"<DeliveryResult {self.user_id} {status} after {self.latency:.2f}s>"
+
+
+class Deliverer:
+    """
+    Sends one embed to many users as DMs, concurrently.
+
+    Users are resolved from the client's cache and only fetched over REST when
+    missing. A semaphore bounds how many sends are in flight. discord.py
+    already waits out 429s, so this cap just keeps a big batch from hitting
+    them over and over. Every run's per-recipient results are kept in history.
+    """
+
+    def __init__(self, bot, max_concurrent: int = 5, history: int = 20):
+        self.bot = bot
+        self.max_concurrent = max_concurrent
+        self.history = deque(maxlen=history)  # (started_at, payload_age, data_age, [DeliveryResult])
+
+    async def _resolve(self, user_id):
+        user = self.bot.get_user(int(user_id))
+        if user is None:
+            user = await self.bot.fetch_user(int(user_id))
+        return user
+
+    async def _send_one(self, semaphore, user_id, start, **kwargs):
+        async with semaphore:
+            try:
+                user = await self._resolve(user_id)
+                await user.send(**kwargs)
+                return DeliveryResult(user_id, True, perf_counter() - start)
+            except (discord.HTTPException, ValueError) as e:
+                return DeliveryResult(user_id, False, perf_counter() - start, str(e))
+
+    async def send(self, user_ids, payload_age: float = None, data_age: float = None, **kwargs) -> list[DeliveryResult]:
+        """
+        Send message kwargs (embed=..., content=...) to every user id.
+        payload_age is how old (s) the prepared payload was and data_age how old
+        the weather data in it was when fetched, both kept for reporting.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        start = perf_counter()
+        results = await asyncio.gather(*(self._send_one(semaphore, user_id, start, **kwargs) for user_id in user_ids))
+        self.history.append((datetime.now(pytz.utc), payload_age, data_age, results))
+
+        failures = [r for r in results if not r.ok]
+        for r in failures:
+            print(f"Error sending forecast to {r.user_id}: {r.error}")
+        if results:
+            age = f", payload {payload_age:.0f}s old" if payload_age is not None else ""
+            age += f", forecast fetched {data_age:.0f}s ago" if data_age is not None else ""
+            print(f"[Forecast] delivered {len(results) - len(failures)}/{len(results)} in {max(r.latency for r in results):.2f}s{age}")
+        return results
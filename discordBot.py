@@ -1,32 +1,44 @@
 import os
 import discord
 from discord.ext import commands, tasks
-from time import time, gmtime, strftime
-from datetime import datetime, timedelta, time as dt
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import pytz
 import asyncio
-
-from rps import RPS
-from weather.weather import Weather
-from tides.tides import predict_tide, rebuild_model
-from celestialtracker import CelestialTracker, SunArcTimer
+import shlex
+import time
+from itertools import islice
+
+from rps import RPSSessions
+from weather.weather import forecast_entry_at
+from tides.tides import predict_tide, TideStation
+from celestialtracker import CelestialTracker
+from services import forecast_service
+from delivery import Deliverer
+from subscriptions import SubscriptionStore, ForecastScheduler
+from locations import DEFAULT_LOCATION, Location
+from message_log import MessageLogger
 
 load_dotenv()
 TOKEN = os.getenv('TOKEN')
 SERVER = os.getenv('SERVER')
 
 IRELAND_TZ = pytz.timezone("Europe/Dublin")
-TIDE_RECIPIENTS = ['287363454665359371', '356458075302920202']
-TARGET_HOUR = 13
+TIDE_RECIPIENTS = ['287363454665359371', '356458075302920202']  # initial subscribers, see SubscriptionStore.seed
+TARGET_HOUR = 13  # default delivery time
 TARGET_MINUTES = 0
 COMMAND_PREFIX='/'
 
 intents = discord.Intents.default()
 intents.message_content = True
 bot = commands.Bot(command_prefix=COMMAND_PREFIX, intents=intents)
+deliverer = Deliverer(bot)
+message_logger = MessageLogger()
+
+subscription_store = SubscriptionStore()
+subscription_store.seed(TIDE_RECIPIENTS, TARGET_HOUR, TARGET_MINUTES, DEFAULT_LOCATION)
 
-rpsDict = {}
+rps_sessions = RPSSessions('rps logs')
 rpsKeys = { 'r': 0, 'rock': 0,
             'p': 1, 'paper': 1,
             's': 2, 'scissors': 2}
@@ -36,6 +48,9 @@ rpsNames = {'0': 'rock',
 rpsOutKeys = {  '-1': 'Computer Wins!',
                 '1' : 'Player Wins!',
                 '0' : 'You drew!'}
+rpsStreakNames = {'-1': 'losses',
+                  '1' : 'wins',
+                  '0' : 'draws'}
 
 def timestamp(datetime):
     return f'<t:{int(datetime.timestamp())}:t>'
@@ -52,26 +67,51 @@ def create_embed(title=None, colour=0x1E90FF, timestamp=None):
 
 
 
-def moon_info(dt=None):
-    ct = CelestialTracker()
-    alt, az = ct.moon_at(dt)
-    _, perc = ct.moon_angular_diameter_pct(dt)
+def moon_info(dt=None, tracker=None):
+    ct = tracker if tracker is not None else CelestialTracker()
+    p = ct.positions(dt)
+    alt, az, perc = float(p["moon_alt"]), float(p["moon_az"]), float(p["moon_size_pct"])
     rise, set = ct.moon_rise_set()
     rise_set_str = f'Rises @ {timestamp(rise)}' if alt <= 0 else f'Sets @ {timestamp(set)}'
-    phase, illum = ct.moon_phase(dt)
+    phase, illum = float(p["phase_angle"]), float(p["illumination"])
     phase_name = ct.moon_phase_name(phase)
     return alt, az, perc, rise_set_str, phase, phase_name, illum
 
-def create_ws_embed():
-    w = Weather()
-    s = w.sunset().astimezone(pytz.utc)
+def get_ws_data(forecast, location=None):
+    """
+    Blocking half of the /ws embed: tide and astronomy work around sunset.
+    forecast is the forecast payload already fetched by build_ws_embed.
+    """
+    ctx = forecast_service.location(location)
+    loc = ctx.location
+    _, s = ctx.tracker.sun_rise_set()
     s1 = s - timedelta(hours=1)
     s2 = s - timedelta(hours=2)
-    h = predict_tide(s)[0]
-    h1 = predict_tide(s1)[0]
-    h2 = predict_tide(s2)[0]
+    h2, h1, h = predict_tide([s2, s1, s], holder=ctx.tide_holder)
+
+    t, forecast = forecast_entry_at(forecast, s)
+
+    moon = moon_info(s, ctx.tracker)
 
-    t, forecast = w.weather_at(s)
+    hand_time = None
+    if s > datetime.now(pytz.utc) + timedelta(hours=2):
+        hand_time, _ = ctx.arc_timer.minutes_per_hand_near_sunset()
+
+    return {
+        "location": loc.name,
+        "sunset": s,
+        "tides": ((s2, h2), (s1, h1), (s, h)),
+        "forecast_time": t,
+        "forecast": forecast,
+        "moon": moon,
+        "hand_time": hand_time,
+    }
+
+def format_ws_embed(data):
+    s = data["sunset"]
+    (s2, h2), (s1, h1), (_, h) = data["tides"]
+    t = data["forecast_time"]
+    forecast = data["forecast"]
     temp = forecast["temperature"]
     temp_margin = forecast["temp_margin"]
     feels_like = forecast["feels_like"]
@@ -79,7 +119,7 @@ def create_ws_embed():
     wind_speed = forecast["wind_speed"]
     cloud_cover = forecast["cloud_cover"]
 
-    alt, az, perc, rise_set_str, phase, phase_name, illum = moon_info(s)
+    alt, az, perc, rise_set_str, phase, phase_name, illum = data["moon"]
 
     embed = create_embed(title="🌅 Evening Tide, Weather & Moon Forecast")
 
@@ -94,7 +134,7 @@ def create_ws_embed():
     )
 
     embed.add_field(
-        name=f"🌤️ Dun Laoghaire Weather Forecast @ {timestamp(t)}",
+        name=f"🌤️ {data['location']} Weather Forecast @ {timestamp(t)}",
         value=(
             f"Temperature: `{temp:.2f}±{temp_margin:.2f} °C` (feels like `{feels_like:.2f} °C`)\n"
             f"Weather: `{weather_desc}`\n"
@@ -117,36 +157,85 @@ def create_ws_embed():
         inline=False
     )
 
-    if s > datetime.now(pytz.utc) + timedelta(hours=2):
-        t, _ = SunArcTimer().minutes_per_hand_near_sunset()
-        embed.set_footer(text=f"{t:.1f} minutes per handwidth (7.149°)")
+    if data["hand_time"] is not None:
+        embed.set_footer(text=f"{data['hand_time']:.1f} minutes per handwidth (7.149°)")
     # embed.set_thumbnail(url="https://i.imgur.com/3ZQ3ZzL.png")  # Example weather icon
 
     return embed
 
-
-
-@tasks.loop(hours=24)
-async def send_daily_forecast():
-    for id in TIDE_RECIPIENTS:
-        user = await bot.fetch_user(id)
+async def build_ws_embed(location=None, refresh=False):
+    """
+    Builds the /ws embed; the heavy lifting runs on the forecast service pool.
+    refresh=True fetches a new forecast rather than taking a cached (possibly stale) one.
+    """
+    forecast = await forecast_service.forecast(location, refresh=refresh)
+    return format_ws_embed(await forecast_service.run(get_ws_data, forecast, location))
+
+
+
+prepared_forecasts = {}  # location -> (built_at, embed, forecast fetched_at), filled by warm_slot
+PREPARED_MARGIN = timedelta(minutes=5)  # on top of the scheduler's lead, how stale a prepared embed may be
+
+async def prepare_forecast(location=None):
+    """Fetch a fresh forecast and everything else for a location, and keep the built embed for delivery."""
+    prepared = await build_prepared(location)
+    prepared_forecasts[location] = prepared
+    return prepared[1]
+
+async def build_prepared(location=None):
+    embed = await build_ws_embed(location, refresh=True)
+    return datetime.now(pytz.utc), embed, forecast_service.forecast_fetched_at(location)
+
+def is_fresh(built_at):
+    """A prepared embed is only used if it was built for today and within the warmup lead (plus a margin)."""
+    now = datetime.now(pytz.utc)
+    same_day = built_at.astimezone(IRELAND_TZ).date() == now.astimezone(IRELAND_TZ).date()
+    return same_day and now - built_at <= forecast_scheduler.lead + PREPARED_MARGIN
+
+async def deliver_forecast(recipients, location=None):
+    """
+    DM the forecast embed to every recipient concurrently, using the payload
+    prepared by the warmup if there is one, otherwise building it once now.
+    """
+    prepared = prepared_forecasts.pop(location, None)
+    if prepared is not None and not is_fresh(prepared[0]):
+        print(f"Discarding forecast for {location} prepared at {prepared[0]:%Y-%m-%d %H:%M} UTC")
+        prepared = None
+    if prepared is None:
         try:
-            await user.send(embed=create_ws_embed())
+            prepared = await build_prepared(location)
         except Exception as e:
-            print(f"Error sending forecast: {e}")
-
-@send_daily_forecast.before_loop
-async def wait_until_1pm():
-    await bot.wait_until_ready()
-    now = datetime.now(IRELAND_TZ)
-    target_time = IRELAND_TZ.localize(datetime.combine(now.date(), dt(hour=TARGET_HOUR, minute=TARGET_MINUTES)))
+            print(f"Error building forecast: {e}")
+            return []
+    built_at, embed, fetched_at = prepared
+    age = (datetime.now(pytz.utc) - built_at).total_seconds()
+    data_age = time.time() - fetched_at if fetched_at is not None else None
+    return await deliverer.send(recipients, payload_age=age, data_age=data_age, embed=embed)
+
+async def warm_slot(hour, minute, subscribers):
+    """Scheduler callback, a few minutes before hour:minute: build each location's embed ahead of time."""
+    results = await asyncio.gather(*(prepare_forecast(location) for location in subscribers), return_exceptions=True)
+    for location, result in zip(subscribers, results):
+        if isinstance(result, Exception):
+            prepared_forecasts.pop(location, None)  # don't leave an older embed behind for delivery
+            print(f"Error preparing forecast for {location}: {result}")
+
+async def deliver_slot(hour, minute, subscribers):
+    """Scheduler callback: one embed per location for everyone due at hour:minute."""
+    await asyncio.gather(*(
+        deliver_forecast(user_ids, location) for location, user_ids in subscribers.items()
+    ))
+
+forecast_scheduler = ForecastScheduler(subscription_store, deliver_slot, warmup=warm_slot)
+bot.subscription_store = subscription_store
+bot.forecast_scheduler = forecast_scheduler
 
-    if now >= target_time:
-        target_time += timedelta(days=1)
-
-    wait_seconds = (target_time - now).total_seconds()
-    # print(f"[Forecast Timer] Sleeping {wait_seconds/3600:.2f} hours until 1pm Ireland time")
-    await asyncio.sleep(wait_seconds)
+@tasks.loop(hours=24)
+async def refresh_tide_model():
+    try:
+        await forecast_service.refit_tide_model()
+    except Exception as e:
+        print(f"Error refreshing tide model: {e}")
 
 
 
@@ -164,8 +253,65 @@ async def on_ready():
     # await bot.tree.sync(guild=discord.Object(id=guild.id))
     await bot.tree.sync()
 
-    if not send_daily_forecast.is_running():
-        send_daily_forecast.start()
+    forecast_scheduler.start()
+
+    if not refresh_tide_model.is_running():
+        refresh_tide_model.start()
+
+
+
+async def search_log(channel, query: str, page_size: int = 10):
+    """
+    -logsearch [channel:NAME] [author:NAME] [since:YYYY-MM-DD] [until:YYYY-MM-DD] [limit:N] text
+    Matches are read off the archive on a worker thread and sent a page at a time.
+    """
+    try:
+        args, words = {"limit": "50"}, []
+        for token in shlex.split(query):
+            key, sep, value = token.partition(':')
+            if sep and key in ('channel', 'author', 'since', 'until', 'limit'):
+                args[key] = value
+            else:
+                words.append(token)
+        since = datetime.strptime(args['since'], '%Y-%m-%d').date() if 'since' in args else None
+        until = datetime.strptime(args['until'], '%Y-%m-%d').date() if 'until' in args else None
+        limit = int(args['limit'])
+    except ValueError as e:
+        await channel.send(f'Bad search: {e}')
+        return
+
+    matches = islice(message_logger.archive.search(
+        ' '.join(words), args.get('channel'), args.get('author'), since, until
+    ), limit)
+    found = 0
+    while True:
+        page = await asyncio.to_thread(lambda: list(islice(matches, page_size)))
+        if not page:
+            break
+        found += len(page)
+        lines = '\n'.join(f'{t} #{c} {a}: {m}'[:180].replace('`', "'") for t, c, a, m in page)
+        await channel.send(f'```{lines}```')
+    await channel.send(f'{found} match{"es" if found != 1 else ""}.')
+
+
+
+async def add_location(channel, args: str):
+    """
+    -addlocation "Name" lat lon ["Tide Station" station_lat]
+    Adds (or replaces) a location and saves it to locations.json. Without a
+    station it uses the default tide station.
+    """
+    try:
+        parts = shlex.split(args)
+        if len(parts) not in (3, 5):
+            raise ValueError('usage: -addlocation "Name" lat lon ["Tide Station" station_lat]')
+        station = TideStation(parts[3], float(parts[4])) if len(parts) == 5 else None
+        location = Location(parts[0], float(parts[1]), float(parts[2]), station)
+    except ValueError as e:
+        await channel.send(f'Bad location: {e}')
+        return
+    forecast_service.locations.add(location)
+    await channel.send(f'Added {location.name} ({location.latitude}, {location.longitude}), tides from {location.tide_station.name}.')
 
 
 
@@ -174,10 +320,8 @@ async def on_message(message):
     # skip if by bot
     if message.author == bot.user: return
 
-    # log message
-    file = 'log.csv'
-    with open(file, 'a', encoding="utf-8") as f:
-        f.write(f"""{strftime('%d/%m/%Y %H:%M:%S', gmtime(time()))},"{str(message.channel)}","{message.author}",{repr(message.content).replace("'",'"')}\n""")
+    # log message (queued, written in batches)
+    message_logger.log_message(message)
 
 
     msg = message.content
@@ -189,13 +333,33 @@ async def on_message(message):
     if message.author.name == 'oneautumnmango':
         if msg.startswith('-rebuild'):
             await message.channel.send(f'Downloading new tide data and rebuilding model...')
-            if rebuild_model():
+            if await forecast_service.rebuild_tide_model():
+                await message.channel.send(f'Success!')
+            else: 
+                await message.channel.send(f'Failure!')
+
+        if msg.startswith('-refit'):
+            await message.channel.send(f'Fetching new tide data and refitting model...')
+            if await forecast_service.refit_tide_model():
                 await message.channel.send(f'Success!')
             else: 
                 await message.channel.send(f'Failure!')
 
         if msg.startswith('-wstest'):
-            await send_daily_forecast(test=True)
+            results = await deliver_forecast([message.author.id])
+            await message.channel.send(f'{results}')
+
+        if msg.startswith('-weatherstats'):
+            await message.channel.send(f'{forecast_service.weather_cache.stats}')
+
+        if msg.startswith('-logsearch'):
+            await search_log(message.channel, msg[len('-logsearch'):])
+
+        if msg.startswith('-logstats'):
+            await message.channel.send(f'{message_logger.stats} queued={message_logger.depth}')
+
+        if msg.startswith('-addlocation'):
+            await add_location(message.channel, msg[len('-addlocation'):])
 
         if msg.startswith('-musicinfo'):
             await message.channel.send(f'{bot.musicbot.last_played=}')
@@ -206,25 +370,27 @@ async def on_message(message):
 
 @bot.tree.command(name="rps", description="Play Rock-Paper-Scissors or view your score.")
 @discord.app_commands.describe(
-    move="Your move: rock (r), paper (p), scissors (s), or 'score' to view stats."
+    move="Your move: rock (r), paper (p), scissors (s), 'score', or 'stats' for streaks and more."
 )
 async def rps(interaction: discord.Interaction, move: str):
     ID = interaction.user.id
 
-    if ID not in rpsDict:
-        rps = RPS(str(interaction.user), ID, folder_path='rps logs')
-        rpsDict[ID] = rps
-    else:
-        rps = rpsDict[ID]
+    rps = rps_sessions.get(ID, str(interaction.user))
 
     move = move.lower()
     if move in ['score', 'stats']:
         s, w, l, d = rps.get_score()
         winrate = f"{(w / float(l + w)) * 100:.2f}%" if l + w > 0 else "N/A"
-        await interaction.response.send_message(
-            f"```Total Games Played: {w + l + d}, Winrate: {winrate}\n"
-            f"Score: {s}, Wins: {w}, Losses: {l}, Draws: {d}```"
-        )
+        text = (f"Total Games Played: {w + l + d}, Winrate: {winrate}\n"
+                f"Score: {s}, Wins: {w}, Losses: {l}, Draws: {d}")
+        if move == 'stats':
+            st = rps.stats()
+            recent = f"{st['recent_winrate'] * 100:.2f}%" if st['recent_winrate'] is not None else "N/A"
+            outcome, length = st['streak']
+            text += (f"\nLast 20 Winrate: {recent}, Current Streak: {length} {rpsStreakNames[str(outcome)]}\n"
+                     f"Longest Win Streak: {st['longest_win']}, Longest Loss Streak: {st['longest_loss']}\n"
+                     f"Your Moves: " + ', '.join(f"{rpsNames[str(i)]} {n}" for i, n in enumerate(st['player_moves'])))
+        await interaction.response.send_message(f"```{text}```")
         return
 
     if move not in rpsKeys:
@@ -253,8 +419,17 @@ async def help(interaction: discord.Interaction):
 async def main():
     await bot.load_extension('cogs.music')
     await bot.load_extension('cogs.astro')
-
-    await bot.start(TOKEN)
+    await bot.load_extension('cogs.forecast')
+
+    message_logger.start()
+    try:
+        await bot.start(TOKEN)
+    finally:
+        await message_logger.close()
+        rps_sessions.close()
+        forecast_scheduler.stop()
+        subscription_store.close()
+        await forecast_service.aclose()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,132 @@
+import os
+import json
+import threading
+from collections import OrderedDict
+
+from celestialtracker import CelestialTracker, SunArcTimer, get_almanac
+from tides.tides import TideStation, DEFAULT_STATION, get_model_holder, drop_tide_tables
+
+LOCATIONS_FILE = 'locations.json'
+DEFAULT_LOCATION = "Dun Laoghaire"
+
+
+class Location:
+    def __init__(self, name: str, latitude: float, longitude: float, tide_station: TideStation = None):
+        self.name = name
+        self.latitude = latitude
+        self.longitude = longitude
+        self.tide_station = tide_station if tide_station is not None else DEFAULT_STATION
+
+    @property
+    def key(self):
+        return self.name.lower()
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "tide_station": self.tide_station.name,
+            "tide_station_lat": self.tide_station.lat,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        station = TideStation(d["tide_station"], d["tide_station_lat"]) if d.get("tide_station") else None
+        return cls(d["name"], d["latitude"], d["longitude"], station)
+
+
+class LocationContext:
+    """Per-location trackers and tide model, each built on first use."""
+
+    def __init__(self, location: Location):
+        self.location = location
+        self._tracker = None
+        self._arc_timer = None
+        self._tide_holder = None
+
+    @property
+    def tracker(self) -> CelestialTracker:
+        if self._tracker is None:
+            self._tracker = CelestialTracker(self.location.latitude, self.location.longitude)
+        return self._tracker
+
+    @property
+    def arc_timer(self) -> SunArcTimer:
+        if self._arc_timer is None:
+            self._arc_timer = SunArcTimer(self.location.latitude, self.location.longitude)
+        return self._arc_timer
+
+    @property
+    def tide_holder(self):
+        if self._tide_holder is None:
+            self._tide_holder = get_model_holder(self.location.tide_station)
+        return self._tide_holder
+
+
+class LocationRegistry:
+    """
+    Known locations, plus an LRU of the ones in use.
+
+    Contexts are only built when a location is asked for, and at most
+    max_active are kept. When one is evicted its almanac days, forecast
+    entries and tide tables are dropped too (the default location is never
+    evicted). Looking up a location never touches any other location's
+    caches, so adding spots doesn't slow existing ones down.
+    """
+
+    def __init__(self, max_active: int = 8, locations_file: str = LOCATIONS_FILE, weather_cache=None):
+        self.max_active = max_active
+        self.locations_file = locations_file
+        self.weather_cache = weather_cache
+        self._lock = threading.Lock()
+        self._locations = {}
+        self._active = OrderedDict()
+
+        self.add(Location(DEFAULT_LOCATION, 53.29395, -6.13586), save=False)
+        if os.path.exists(locations_file):
+            with open(locations_file, 'r') as f:
+                for d in json.load(f):
+                    self.add(Location.from_dict(d), save=False)
+
+    def names(self):
+        return [location.name for location in self._locations.values()]
+
+    def add(self, location: Location, save: bool = True):
+        with self._lock:
+            self._locations[location.key] = location
+            replaced = self._active.pop(location.key, None)
+            if replaced is not None:
+                self._evict(replaced)
+            if save:
+                extra = [l.to_dict() for l in self._locations.values() if l.name != DEFAULT_LOCATION]
+                with open(self.locations_file, 'w') as f:
+                    json.dump(extra, f, indent=2)
+
+    def get(self, name: str = None) -> LocationContext:
+        """Context for a location by name (case-insensitive), default Dun Laoghaire. Raises KeyError if unknown."""
+        key = (name or DEFAULT_LOCATION).lower()
+        with self._lock:
+            context = self._active.get(key)
+            if context is not None:
+                self._active.move_to_end(key)
+                return context
+
+            location = self._locations.get(key)
+            if location is None:
+                raise KeyError(f"Unknown location '{name}'. Try one of: {', '.join(self.names())}")
+
+            context = LocationContext(location)
+            self._active[key] = context
+            while len(self._active) > self.max_active:
+                evict_key = next(k for k in self._active if k != DEFAULT_LOCATION.lower())
+                self._evict(self._active.pop(evict_key))
+            return context
+
+    def _evict(self, context: LocationContext):
+        location = context.location
+        get_almanac().forget(location.latitude, location.longitude)
+        if self.weather_cache is not None:
+            self.weather_cache.forget(location.latitude, location.longitude)
+        if location.tide_station.name != DEFAULT_STATION.name:
+            drop_tide_tables(location.tide_station.name)
@@ -0,0 +1,269 @@
+import os
+import re
+import csv
+import gzip
+import json
+import asyncio
+import threading
+from datetime import date
+from time import time, gmtime, strftime, monotonic
+
+LEGACY_LOG_FILE = 'log.csv'
+ARCHIVE_DIR = 'message logs'
+INDEX_FILE = 'index.json'
+TIME_FORMAT = '%d/%m/%Y %H:%M:%S'
+
+_STOP = object()  # queued by MessageLogger.close() to stop the writer
+
+LEGACY_ROW = re.compile(r'^(\d\d/\d\d/\d{4} \d\d:\d\d:\d\d),"(.*?)","(.*?)",(.*)$')
+
+
+def row_day(timestamp: str) -> str:
+    """'dd/mm/YYYY HH:MM:SS' -> 'YYYY-MM-DD' (segment name)."""
+    return f"{timestamp[6:10]}-{timestamp[3:5]}-{timestamp[0:2]}"
+
+
+class MessageArchive:
+    """
+    Message log split into one CSV segment per UTC day.
+
+    Only the current day's segment is plain CSV and appended to. When rows for
+    a later day arrive (or at startup), older segments are closed: gzipped, and
+    a summary of their rows per channel and author is added to index.json.
+    search() uses the index to skip days that can't match, so it only
+    decompresses the segments it needs. It streams rows as it reads them.
+    """
+
+    def __init__(self, folder: str = ARCHIVE_DIR, legacy_file: str = LEGACY_LOG_FILE):
+        self.folder = folder
+        self.index_path = os.path.join(folder, INDEX_FILE)
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+        self.index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r') as f:
+                self.index = json.load(f)
+
+        if legacy_file and os.path.exists(legacy_file):
+            self._migrate(legacy_file)
+        self.rotate(strftime('%Y-%m-%d', gmtime(time())))
+
+    def _segment(self, day: str, closed: bool = False) -> str:
+        return os.path.join(self.folder, f"log-{day}.csv" + (".gz" if closed else ""))
+
+    def open_days(self):
+        return sorted(name[4:14] for name in os.listdir(self.folder) if name.startswith('log-') and name.endswith('.csv'))
+
+    def append(self, rows):
+        """Write [timestamp, channel, author, content] rows into their day's segment."""
+        by_day = {}
+        for row in rows:
+            by_day.setdefault(row_day(row[0]), []).append(row)
+        with self._lock:
+            for day, day_rows in sorted(by_day.items()):
+                with open(self._segment(day), 'a', encoding="utf-8", newline='') as f:
+                    csv.writer(f).writerows(day_rows)
+            self._rotate(max(by_day))
+
+    def rotate(self, current_day: str):
+        with self._lock:
+            self._rotate(current_day)
+
+    def _rotate(self, current_day: str):
+        closed = False
+        for day in self.open_days():
+            if day < current_day:
+                self._close_segment(day)
+                closed = True
+        if closed:
+            self._save_index()
+
+    def _close_segment(self, day: str):
+        """Gzip a finished segment and index it. Rows that arrive late for a closed day are merged in."""
+        path, gz_path = self._segment(day), self._segment(day, closed=True)
+        rows = list(self._read(gz_path)) if os.path.exists(gz_path) else []
+        rows.extend(self._read(path))
+
+        entry = {"rows": len(rows), "channels": {}, "authors": {}}
+        for _, channel, author, _ in rows:
+            entry["channels"][channel] = entry["channels"].get(channel, 0) + 1
+            entry["authors"][author] = entry["authors"].get(author, 0) + 1
+
+        with gzip.open(gz_path + '.tmp', 'wt', encoding="utf-8", newline='') as f:
+            csv.writer(f).writerows(rows)
+        os.replace(gz_path + '.tmp', gz_path)
+        os.remove(path)
+        self.index[day] = entry
+
+    def _save_index(self):
+        with open(self.index_path + '.tmp', 'w') as f:
+            json.dump(self.index, f)
+        os.replace(self.index_path + '.tmp', self.index_path)
+
+    @staticmethod
+    def _read(path: str):
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding="utf-8", newline='') as f:
+            for row in csv.reader(f):
+                if len(row) == 4:
+                    yield row
+
+    def _migrate(self, legacy_file: str):
+        """Split the old single log.csv into day segments, then move it aside."""
+        rows = []
+        with open(legacy_file, 'r', encoding="utf-8", errors="replace") as f:
+            for line in f:
+                m = LEGACY_ROW.match(line.rstrip('\n'))
+                if m is None:
+                    continue
+                timestamp, channel, author, content = m.groups()
+                if len(content) >= 2 and content[0] == content[-1] == '"':
+                    content = content[1:-1]
+                rows.append([timestamp, channel, author, content])
+        if rows:
+            self.append(rows)
+        os.replace(legacy_file, legacy_file + '.migrated')
+        print(f"[Message Log] migrated {len(rows)} rows from {legacy_file}")
+
+    def _days_to_search(self, channel, author, since, until):
+        with self._lock:
+            index = dict(self.index)
+            open_days = self.open_days()
+
+        days = []
+        for day, entry in index.items():
+            if since and day < since or until and day > until:
+                continue
+            if channel and not any(c.lower() == channel for c in entry["channels"]):
+                continue
+            if author and not any(a.lower() == author for a in entry["authors"]):
+                continue
+            days.append((day, True))
+        # open segments aren't indexed yet, they're at most a day or so of rows
+        days.extend((day, False) for day in open_days if not (since and day < since or until and day > until))
+        return sorted(days)
+
+    def search(self, text: str = None, channel: str = None, author: str = None, since: date = None, until: date = None):
+        """
+        Yield [timestamp, channel, author, content] rows, oldest first.
+        text matches content (case-insensitive). channel and author must match exactly, ignoring case.
+        """
+        text = text.lower() if text else None
+        channel = channel.lower() if channel else None
+        author = author.lower() if author else None
+        since = since.isoformat() if since else None
+        until = until.isoformat() if until else None
+
+        for day, closed in self._days_to_search(channel, author, since, until):
+            path = self._segment(day, closed)
+            if not closed and not os.path.exists(path):
+                path = self._segment(day, closed=True)  # closed since it was listed
+            for row in self._read(path):
+                if channel and row[1].lower() != channel:
+                    continue
+                if author and row[2].lower() != author:
+                    continue
+                if text and text not in row[3].lower():
+                    continue
+                yield row
+
+
+class MessageLogger:
+    """
+    Non-blocking message log.
+
+    Handlers call log(), which only puts a row on a bounded queue. A background
+    task writes rows to the archive in batches, whenever batch_size rows are
+    waiting or flush_interval seconds have passed, on a worker thread. If the
+    queue is full the row is dropped and counted rather than stalling the
+    event loop. close() drains and flushes everything left.
+    """
+
+    def __init__(self, archive: MessageArchive = None, max_queue: int = 10000, batch_size: int = 200, flush_interval: float = 2.0):
+        self.archive = archive if archive is not None else MessageArchive()
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.stats = {"logged": 0, "written": 0, "dropped": 0, "batches": 0, "max_depth": 0}
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._writer())
+
+    @property
+    def depth(self) -> int:
+        """Rows waiting to be written."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def log_message(self, message):
+        self.log([
+            strftime(TIME_FORMAT, gmtime(time())),
+            str(message.channel),
+            str(message.author),
+            message.content,
+        ])
+
+    def log(self, row):
+        if self._queue is None:
+            self.start()
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            return
+        self.stats["logged"] += 1
+        self.stats["max_depth"] = max(self.stats["max_depth"], self._queue.qsize())
+
+    async def _flush(self, rows):
+        if not rows:
+            return
+        try:
+            await asyncio.to_thread(self.archive.append, rows)
+            self.stats["written"] += len(rows)
+            self.stats["batches"] += 1
+        except OSError as e:
+            self.stats["dropped"] += len(rows)
+            print(f"Error writing message log: {e}")
+
+    async def _writer(self):
+        """Write batches until close() queues _STOP, then flush the batch in hand and return."""
+        while True:
+            row = await self._queue.get()
+            if row is _STOP:
+                return
+            rows = [row]
+            deadline = monotonic() + self.flush_interval
+            while len(rows) < self.batch_size:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if row is _STOP:
+                    await self._flush(rows)
+                    return
+                rows.append(row)
+            await self._flush(rows)
+
+    async def close(self):
+        """Stop the writer and flush whatever is still queued."""
+        if self._task is not None:
+            if not self._task.done():
+                await self._queue.put(_STOP)
+            try:
+                await self._task
+            except Exception as e:
+                print(f"Message log writer failed: {e}")
+            self._task = None
+        if self._queue is not None:
+            rows = []
+            while not self._queue.empty():
+                rows.append(self._queue.get_nowait())
+            await self._flush(rows)
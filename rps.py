@@ -1,6 +1,10 @@
 import random
 import os
 import json
+from collections import OrderedDict
+from time import monotonic
+
+import numpy as np
 
 
 def randomRPS(player_in):
@@ -10,24 +14,60 @@ def cheaterRPS(player_in):
     return (player_in + 1) % 3
 
 
+# one byte per game in the log: bits 0-1 comp_in, bits 2-3 player_in, bits 4-5 outcome + 1
+def pack_game(comp_in, player_in, outcome):
+    return comp_in | player_in << 2 | (outcome + 1) << 4
+
+def unpack_game(b):
+    return b & 3, (b >> 2) & 3, ((b >> 4) & 3) - 1
+
+def unpack_games(packed: np.ndarray):
+    """Vectorised unpack_game over a uint8 array: (comp_in, player_in, outcome) arrays."""
+    return packed & 3, (packed >> 2) & 3, ((packed >> 4) & 3).astype(np.int8) - 1
+
+
 class RPS():  # r p s = 0 1 2
-    
-    def __init__(self, player_name, ID, AI=randomRPS, folder_path='.'):
-        self.player_name = player_name  # used to separate data between players
-        self.ID = ID  
+    """
+    A player's games are kept in two files (key is the player name unless given):
+        {key}.games  append-only log, one packed byte per game
+        {key}.json   checkpoint of the score/wins/losses/draws after the first `games` records
+
+    Each game is appended to the log and fsynced in batches (every sync_every
+    games or sync_interval seconds). The checkpoint is rewritten atomically
+    every checkpoint_every games. On load the checkpoint is read and any games
+    logged after it are replayed. Old style .json files with the full 'data'
+    list are converted on first load.
+
+    The whole history is also held in memory as the same packed bytes
+    (self.history, a bytearray read straight from the log), so stats() can
+    work on it with NumPy without building a list per game.
+    """
+
+    def __init__(self, player_name, ID, AI=randomRPS, folder_path='.',
+                 sync_every=10, sync_interval=5.0, checkpoint_every=100, key=None):
+        self.player_name = player_name
+        self.key = str(key) if key is not None else player_name  # file name, used to separate data between players
+        self.ID = ID
         self.AI = AI                    # func to generate computer choice
         self.folder_path = folder_path  # folder to store data
-        
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.checkpoint_every = checkpoint_every
+
+        self._log = None
+        self.history = bytearray()
+        self._unsynced = 0
+        self._last_sync = monotonic()
         self.generate_file()
-    
+
     def play(self, player_in):
         comp_in = self.AI(player_in)
         outcome = self.get_outcome(comp_in, player_in)
-        
+
         self.add_game(comp_in, player_in, outcome)
         return comp_in, player_in, outcome
- 
-    
+
+
     def get_outcome(self, comp_in: int, player_in: int) -> int:  # input is one of [0, 1, 2]
         if comp_in == player_in:
             return 0  # tie
@@ -37,14 +77,21 @@ class RPS():  # r p s = 0 1 2
 
 
     def generate_file(self, reset=False):
-        self.path = f'{self.folder_path}/{self.player_name}.json'
+        self.path = f'{self.folder_path}/{self.key}.json'
+        self.log_path = f'{self.folder_path}/{self.key}.games'
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
         if os.path.exists(self.path) and not reset:
             print(f'File {self.path} already exists. Reading data...')
             with open(self.path, 'r') as f:
                 self.file = json.load(f)
-            return
-        
-        self.file = {
+            if 'data' in self.file['rps']:
+                self._migrate()
+            self._replay()
+        else:
+            self.file = {
     'ID': self.ID,
     'Name': self.player_name,
     'rps': {
@@ -52,30 +99,298 @@ class RPS():  # r p s = 0 1 2
         'wins': 0,
         'losses': 0,
         'draws': 0,
-        'data': [
-            ["Cin", "Pin", "Pout"] # comp_in, player_in, player_out  (comp_out = -player_out)
-        ]
+        'games': 0  # log records covered by this checkpoint
     }
 }
+            open(self.log_path, 'wb').close()
+            self.history = bytearray()
+            self.checkpoint()
 
-        with open(self.path, 'w') as f:
-            json.dump(self.file, f)
+        self._log = open(self.log_path, 'ab')
 
 
-    def add_game(self, comp_in, player_in, outcome):
+    def _count(self, outcome):
         rps = self.file['rps']
-
         if outcome == -1: rps['losses'] += 1
         elif outcome == 1: rps['wins'] += 1
         else: rps['draws'] += 1
-
-        rps['data'].append([comp_in, player_in, outcome])
         rps['score'] += outcome
+        rps['games'] += 1
+
+
+    def _replay(self):
+        """Load the log into self.history and bring the checkpointed counts up to date with it."""
+        rps = self.file['rps']
+        size = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+        self.history = bytearray(size)
+        if size:
+            with open(self.log_path, 'rb') as f:
+                f.readinto(self.history)
+
+        start = rps['games']
+        if size < start:
+            # checkpoint is ahead of the log (games lost before an fsync), recount from the log
+            rps.update(score=0, wins=0, losses=0, draws=0, games=0)
+            start = 0
+        if size != start:
+            _, _, outcomes = unpack_games(np.frombuffer(self.history, dtype=np.uint8)[start:])
+            losses, draws, wins = np.bincount(outcomes + 1, minlength=3).tolist()
+            rps.update(
+                score=rps['score'] + wins - losses, wins=rps['wins'] + wins, losses=rps['losses'] + losses,
+                draws=rps['draws'] + draws, games=size
+            )
+            self.checkpoint()
+
+
+    def _migrate(self):
+        """Move the games out of an old style .json into the log."""
+        rows = self.file['rps'].pop('data')[1:]  # skip the ["Cin", "Pin", "Pout"] header
+        with open(self.log_path, 'wb') as f:
+            f.write(bytes(pack_game(*row) for row in rows))
+            f.flush()
+            os.fsync(f.fileno())
+        self.file['rps']['games'] = len(rows)
+        self.checkpoint()
+        print(f'Migrated {len(rows)} games from {self.path} to {self.log_path}')
 
-        with open(self.path, 'w') as f:
+
+    def checkpoint(self):
+        with open(self.path + '.tmp', 'w') as f:
             json.dump(self.file, f)
+        os.replace(self.path + '.tmp', self.path)
+
+
+    def sync(self):
+        if self._log is not None and self._unsynced:
+            self._log.flush()
+            os.fsync(self._log.fileno())
+        self._unsynced = 0
+        self._last_sync = monotonic()
+
+
+    def add_game(self, comp_in, player_in, outcome):
+        packed = pack_game(comp_in, player_in, outcome)
+        self.history.append(packed)
+        self._log.write(bytes((packed,)))
+        self._log.flush()
+        self._unsynced += 1
+        self._count(outcome)
+
+        if self._unsynced >= self.sync_every or monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+        if self.file['rps']['games'] % self.checkpoint_every == 0:
+            self.sync()
+            self.checkpoint()
+
+
+    def close(self):
+        """fsync the log and write a final checkpoint."""
+        if self._log is None:
+            return
+        self.sync()
+        self.checkpoint()
+        self._log.close()
+        self._log = None
 
 
     def get_score(self):
         rps = self.file['rps']
         return rps['score'], rps['wins'], rps['losses'], rps['draws']
+
+
+    def stats(self, window=20):
+        """
+        Stats over the packed history:
+            player_moves / comp_moves  counts of rock, paper, scissors
+            streak                     current run as (outcome, length), outcome is 1/0/-1
+            longest_win / longest_loss longest runs of wins and losses
+            recent_winrate             wins / (wins + losses) over the last `window` games, None if no decisive games
+            winrate_windows            the same for each consecutive block of `window` games, oldest first
+        """
+        comp, player, outcome = unpack_games(np.frombuffer(self.history, dtype=np.uint8))
+        n = len(outcome)
+        stats = {
+            'games': n,
+            'player_moves': np.bincount(player, minlength=3)[:3].tolist(),
+            'comp_moves': np.bincount(comp, minlength=3)[:3].tolist(),
+            'streak': (0, 0),
+            'longest_win': 0,
+            'longest_loss': 0,
+            'recent_winrate': None,
+            'winrate_windows': [],
+        }
+        if n == 0:
+            return stats
+
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(outcome)) + 1))
+        lengths = np.diff(np.concatenate((starts, [n])))
+        values = outcome[starts]
+        stats['streak'] = (int(values[-1]), int(lengths[-1]))
+        stats['longest_win'] = int(lengths[values == 1].max(initial=0))
+        stats['longest_loss'] = int(lengths[values == -1].max(initial=0))
+
+        def winrate(wins, decisive):
+            return np.where(decisive > 0, wins / np.maximum(decisive, 1), np.nan)
+
+        recent = outcome[-window:]
+        rate = winrate(np.count_nonzero(recent == 1), np.count_nonzero(recent))
+        stats['recent_winrate'] = None if np.isnan(rate) else float(rate)
+
+        blocks = outcome[:n - n % window].reshape(-1, window)
+        rates = winrate((blocks == 1).sum(axis=1), (blocks != 0).sum(axis=1))
+        stats['winrate_windows'] = [None if np.isnan(r) else float(r) for r in rates]
+        return stats
+
+
+def migrate_folder(folder_path):
+    """Convert every old style player .json in a folder to a log + checkpoint."""
+    for name in os.listdir(folder_path):
+        if not name.endswith('.json'):
+            continue
+        with open(f'{folder_path}/{name}', 'r') as f:
+            file = json.load(f)
+        if 'data' in file['rps']:
+            RPS(name[:-len('.json')], file['ID'], folder_path=folder_path).close()
+
+
+def count_games(games) -> dict:
+    """Checkpoint counts for a packed log."""
+    rps = {'score': 0, 'wins': 0, 'losses': 0, 'draws': 0, 'games': len(games)}
+    for b in games:
+        outcome = unpack_game(b)[2]
+        rps['score'] += outcome
+        rps['wins' if outcome == 1 else 'losses' if outcome == -1 else 'draws'] += 1
+    return rps
+
+
+def merge_legacy_files(folder_path):
+    """
+    Merge name keyed player files into one {ID}.json/.games per player.
+
+    The old files were named after str(user), so a user who renamed ended up
+    with several (e.g. Mango#6990.json and oneautumnmango.json). A renamed
+    user's new file usually starts with a full copy of the old one, so a log
+    that is a prefix of what's been merged so far is skipped, and a log that
+    extends it only adds its new games; anything else is appended whole
+    (oldest first: discriminator names before new usernames, then by
+    modification time). The old files are only renamed to *.merged once each
+    one's checkpoint agrees with its log and the merged log reads back intact.
+    """
+    players = {}
+    for name in os.listdir(folder_path):
+        if not name.endswith('.json'):
+            continue
+        with open(f'{folder_path}/{name}', 'r') as f:
+            file = json.load(f)
+        key = name[:-len('.json')]
+        if key != str(file['ID']):
+            players.setdefault(file['ID'], []).append((key, file['Name']))
+
+    for ID, legacy in players.items():
+        legacy.sort(key=lambda k: ('#' not in k[0], os.path.getmtime(f'{folder_path}/{k[0]}.json')))
+        keys = [k for k, _ in legacy]
+        if os.path.exists(f'{folder_path}/{ID}.json'):
+            keys.insert(0, str(ID))
+
+        games = bytearray()
+        mismatched = []
+        for key in keys:
+            log = b''
+            if os.path.exists(f'{folder_path}/{key}.games'):
+                with open(f'{folder_path}/{key}.games', 'rb') as f:
+                    log = f.read()
+            with open(f'{folder_path}/{key}.json', 'r') as f:
+                checkpoint = json.load(f)['rps']
+            if count_games(log[:checkpoint['games']]) != checkpoint:  # games after the checkpoint are fine, replay picks them up
+                mismatched.append(key)
+
+            if games.startswith(log):
+                continue  # already have all of these
+            if log.startswith(games):
+                games += log[len(games):]
+            else:
+                games += log
+
+        if mismatched:
+            print(f'Not merging {", ".join(keys)} into {ID}.json: counts for {", ".join(mismatched)} don\'t match their logs')
+            continue
+
+        log_path = f'{folder_path}/{ID}.games'
+        with open(log_path + '.tmp', 'wb') as f:
+            f.write(games)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(log_path + '.tmp', log_path)
+        with open(log_path, 'rb') as f:
+            if f.read() != games:
+                print(f'Not merging {", ".join(keys)} into {ID}.json: merged log did not read back intact')
+                continue
+
+        rps = count_games(games)
+        with open(f'{folder_path}/{ID}.json.tmp', 'w') as f:
+            json.dump({'ID': ID, 'Name': legacy[-1][1], 'rps': rps}, f)
+        os.replace(f'{folder_path}/{ID}.json.tmp', f'{folder_path}/{ID}.json')
+
+        for key, _ in legacy:
+            for ext in ('.json', '.games'):
+                if os.path.exists(f'{folder_path}/{key}{ext}'):
+                    os.replace(f'{folder_path}/{key}{ext}', f'{folder_path}/{key}{ext}.merged')
+        print(f'Merged {", ".join(k for k, _ in legacy)} into {ID}.json ({len(games)} games, score {rps["score"]})')
+
+
+class RPSSessions:
+    """
+    Hot RPS players, keyed by user ID.
+
+    At most max_players RPS instances are kept, least recently used first
+    out, and any player idle for longer than idle_ttl seconds is dropped the
+    next time a session is looked up. Evicted players are closed, which
+    fsyncs their log and writes a checkpoint, so nothing is lost and they are
+    simply reloaded from disk next time. Old name keyed files are migrated and
+    merged into ID keyed ones when this is created.
+    """
+
+    def __init__(self, folder_path='rps logs', max_players=64, idle_ttl=1800.0, AI=randomRPS):
+        self.folder_path = folder_path
+        self.max_players = max_players
+        self.idle_ttl = idle_ttl
+        self.AI = AI
+        self._active = OrderedDict()  # ID -> (RPS, last used)
+
+        os.makedirs(folder_path, exist_ok=True)
+        migrate_folder(folder_path)
+        merge_legacy_files(folder_path)
+
+    def __len__(self):
+        return len(self._active)
+
+    def get(self, ID, player_name) -> RPS:
+        self.sweep()
+        entry = self._active.pop(ID, None)
+        if entry is not None:
+            rps = entry[0]
+            if rps.file['Name'] != player_name:
+                rps.file['Name'] = rps.player_name = player_name  # saved with the next checkpoint
+        else:
+            rps = RPS(player_name, ID, AI=self.AI, folder_path=self.folder_path, key=ID)
+        self._active[ID] = (rps, monotonic())
+
+        while len(self._active) > self.max_players:
+            _, (evicted, _) = self._active.popitem(last=False)
+            evicted.close()
+        return rps
+
+    def sweep(self):
+        """Close players that have been idle for longer than idle_ttl."""
+        cutoff = monotonic() - self.idle_ttl
+        while self._active:
+            ID, (rps, last_used) = next(iter(self._active.items()))
+            if last_used > cutoff:
+                break
+            del self._active[ID]
+            rps.close()
+
+    def close(self):
+        while self._active:
+            _, (rps, _) = self._active.popitem(last=False)
+            rps.close()
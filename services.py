@@ -0,0 +1,105 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+
+import pytz
+
+from weather.weather import AsyncWeather, WeatherCache, WeatherClient
+from tides.tides import predict_tide, rebuild_model, tide_table
+from locations import LocationRegistry
+
+
+class ForecastService:
+    """Async facade over the blocking weather, tide and astronomy code.
+
+    Everything here is run on a bounded thread pool so the event loop (and the
+    gateway heartbeat) never waits on Skyfield, utide or HTTP. A semaphore caps
+    how many jobs can be queued at once so a burst of /ws calls can't pile up
+    behind each other and hog every worker.
+    """
+
+    def __init__(self, max_workers: int = 4, max_concurrent: int = 4, weather_client: WeatherClient = None):
+        self.max_workers = max_workers
+        self.max_concurrent = max_concurrent
+        self.weather_client = weather_client if weather_client is not None else WeatherClient()
+        self.weather_cache = WeatherCache(self.weather_client)
+        self.locations = LocationRegistry(weather_cache=self.weather_cache)
+        self._executor = None
+        self._semaphore = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='forecast')
+        return self._executor
+
+    def _get_semaphore(self):
+        # created lazily so it binds to the running loop rather than import time
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    async def run(self, func, *args, **kwargs):
+        async with self._get_semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), partial(func, *args, **kwargs))
+
+    def location(self, name: str = None):
+        """LocationContext for a location name (default Dun Laoghaire), KeyError if unknown."""
+        return self.locations.get(name)
+
+    def weather(self, location: str = None):
+        loc = self.location(location).location
+        return AsyncWeather(self.weather_cache).with_lat_lon(loc.latitude, loc.longitude)
+
+    async def weather_now(self, location: str = None):
+        return await self.weather(location).weather_now()
+
+    async def weather_at(self, dt: datetime, location: str = None):
+        return await self.weather(location).weather_at(dt)
+
+    async def forecast(self, location: str = None, refresh: bool = False):
+        return await self.weather(location).forecast(refresh=refresh)
+
+    def forecast_fetched_at(self, location: str = None):
+        """When the location's cached forecast was fetched (epoch seconds), None if never."""
+        loc = self.location(location).location
+        return self.weather_cache.fetched_at("forecast", loc.latitude, loc.longitude)
+
+    async def sunset(self, location: str = None):
+        tracker = self.location(location).tracker
+        return await self.run(lambda: tracker.sun_rise_set()[1])
+
+    async def tide_at(self, dt: datetime = None, location: str = None):
+        dt = dt if dt is not None else datetime.now(pytz.utc)
+        holder = self.location(location).tide_holder
+        return await self.run(lambda: predict_tide(dt, holder=holder)[0])
+
+    async def tide_table(self, day=None, location: str = None):
+        return await self.run(tide_table, day, self.location(location).tide_holder)
+
+    async def sun_at(self, dt: datetime = None, location: str = None):
+        tracker = self.location(location).tracker
+        return await self.run(lambda: tracker.sun_at(dt))
+
+    async def hand_time(self, location: str = None):
+        timer = self.location(location).arc_timer
+        return await self.run(lambda: timer.minutes_per_hand_near_sunset())
+
+    async def rebuild_tide_model(self):
+        return await self.run(rebuild_model)
+
+    async def refit_tide_model(self):
+        return await self.run(rebuild_model, incremental=True)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def aclose(self):
+        self.shutdown()
+        await self.weather_client.close()
+
+
+forecast_service = ForecastService()
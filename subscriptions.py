@@ -0,0 +1,182 @@
+import asyncio
+import heapq
+import sqlite3
+import threading
+from datetime import datetime, timedelta, time as dt
+
+import pytz
+
+IRELAND_TZ = pytz.timezone("Europe/Dublin")
+SUBSCRIPTIONS_DB = 'subscriptions.db'
+
+
+class SubscriptionStore:
+    """Daily forecast subscriptions in SQLite: one row per (user, location) with a local delivery time."""
+
+    def __init__(self, path: str = SUBSCRIPTIONS_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS subscriptions (
+                    user_id TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    hour INTEGER NOT NULL,
+                    minute INTEGER NOT NULL,
+                    created_at TEXT NOT NULL,
+                    PRIMARY KEY (user_id, location)
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS subscriptions_slot ON subscriptions (hour, minute)")
+
+    def seed(self, user_ids, hour: int, minute: int, location: str):
+        """Subscribe user_ids only if the table is empty (carries the old hardcoded recipients over)."""
+        with self._lock, self._conn:
+            if self._conn.execute("SELECT COUNT(*) FROM subscriptions").fetchone()[0]:
+                return
+            now = datetime.now(pytz.utc).isoformat()
+            self._conn.executemany(
+                "INSERT INTO subscriptions VALUES (?, ?, ?, ?, ?)",
+                [(str(user_id), location, hour, minute, now) for user_id in user_ids]
+            )
+
+    def subscribe(self, user_id, hour: int, minute: int, location: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO subscriptions VALUES (?, ?, ?, ?, ?)",
+                (str(user_id), location, hour, minute, datetime.now(pytz.utc).isoformat())
+            )
+
+    def unsubscribe(self, user_id, location: str = None) -> int:
+        """Remove one location's subscription, or all of them. Returns how many were removed."""
+        with self._lock, self._conn:
+            if location is None:
+                cur = self._conn.execute("DELETE FROM subscriptions WHERE user_id = ?", (str(user_id),))
+            else:
+                cur = self._conn.execute(
+                    "DELETE FROM subscriptions WHERE user_id = ? AND location = ? COLLATE NOCASE",
+                    (str(user_id), location)
+                )
+            return cur.rowcount
+
+    def for_user(self, user_id):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT location, hour, minute FROM subscriptions WHERE user_id = ? ORDER BY hour, minute",
+                (str(user_id),)
+            ).fetchall()
+
+    def slots(self):
+        """Distinct (hour, minute) delivery times."""
+        with self._lock:
+            return self._conn.execute("SELECT DISTINCT hour, minute FROM subscriptions").fetchall()
+
+    def due(self, hour: int, minute: int) -> dict:
+        """Subscribers for a delivery time, grouped as {location: [user_id]}."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT location, user_id FROM subscriptions WHERE hour = ? AND minute = ?", (hour, minute)
+            ).fetchall()
+        grouped = {}
+        for location, user_id in rows:
+            grouped.setdefault(location, []).append(user_id)
+        return grouped
+
+    def close(self):
+        self._conn.close()
+
+
+def next_occurrence(hour: int, minute: int, after: datetime, tz=IRELAND_TZ) -> datetime:
+    """Next local hour:minute strictly after `after`, as an aware UTC datetime."""
+    local = after.astimezone(tz)
+    target = tz.localize(datetime.combine(local.date(), dt(hour=hour, minute=minute)))
+    if target <= local:
+        target = tz.localize(datetime.combine(local.date() + timedelta(days=1), dt(hour=hour, minute=minute)))
+    return target.astimezone(pytz.utc)
+
+
+WARMUP, DELIVER = 0, 1
+
+
+class ForecastScheduler:
+    """
+    Heap of upcoming delivery slots. The loop sleeps until the earliest event
+    and passes every subscriber due at that time, as {location: [user_id]},
+    in one batch. There are two events per slot: warmup(hour, minute,
+    subscribers) runs `lead` before the slot to prefetch and build the
+    payload, then deliver(hour, minute, subscribers) at the slot only sends it.
+    A warmup for the first slot also runs straight away at startup. Any change
+    to the subscriptions calls reschedule() to rebuild the heap and wake it.
+    """
+
+    def __init__(self, store: SubscriptionStore, deliver, warmup=None, lead: timedelta = timedelta(minutes=5)):
+        self.store = store
+        self.deliver = deliver
+        self.warmup = warmup
+        self.lead = lead
+        self._heap = []
+        self._changed = asyncio.Event()
+        self._task = None
+
+    def _push_slot(self, when, hour, minute, now):
+        heapq.heappush(self._heap, (when, DELIVER, hour, minute))
+        if self.warmup is not None:
+            heapq.heappush(self._heap, (max(when - self.lead, now), WARMUP, hour, minute))
+
+    def _rebuild(self):
+        now = datetime.now(pytz.utc)
+        self._heap = []
+        for hour, minute in self.store.slots():
+            self._push_slot(next_occurrence(hour, minute, now), hour, minute, now)
+
+    def reschedule(self):
+        self._changed.set()
+
+    def next_run(self):
+        return self._heap[0][0] if self._heap else None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _sleep_until(self, when) -> bool:
+        """Sleep until `when` (or forever if None). Returns False if woken early by reschedule()."""
+        timeout = None if when is None else max((when - datetime.now(pytz.utc)).total_seconds(), 0)
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+            return False
+        except asyncio.TimeoutError:
+            return True
+
+    async def _startup_warmup(self):
+        if self.warmup is None or not self._heap:
+            return
+        _, _, hour, minute = min(e for e in self._heap if e[1] == DELIVER)
+        try:
+            await self.warmup(hour, minute, self.store.due(hour, minute))
+        except Exception as e:
+            print(f"[Forecast Scheduler] startup warmup failed: {e}")
+
+    async def _run(self):
+        self._rebuild()
+        await self._startup_warmup()
+        while True:
+            if not await self._sleep_until(self.next_run()):
+                self._changed.clear()
+                self._rebuild()
+                continue
+
+            when, kind, hour, minute = heapq.heappop(self._heap)
+            if kind == DELIVER:
+                self._push_slot(next_occurrence(hour, minute, when), hour, minute, when)
+            callback = self.deliver if kind == DELIVER else self.warmup
+            try:
+                await callback(hour, minute, self.store.due(hour, minute))
+            except Exception as e:
+                stage = "delivery" if kind == DELIVER else "warmup"
+                print(f"[Forecast Scheduler] {stage} for {hour:02d}:{minute:02d} failed: {e}")
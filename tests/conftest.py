@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the bot's modules live at the repository root and are imported as top level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,36 @@
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+skyfield_api = pytest.importorskip("skyfield.api")
+
+from celestialtracker import to_time
+
+
+@pytest.fixture(scope="module")
+def ts():
+    return skyfield_api.load.timescale()
+
+
+def test_datetime64_matches_datetime(ts):
+    instants = [
+        datetime(2026, 10, 18, tzinfo=timezone.utc),
+        datetime(2024, 2, 29, 12, 34, 56, 789000, tzinfo=timezone.utc),
+        datetime(2016, 12, 31, 23, 59, 59, tzinfo=timezone.utc),  # just before a leap second
+        datetime(1999, 1, 1, tzinfo=timezone.utc),
+    ]
+    as_datetime64 = np.array([dt.replace(tzinfo=None) for dt in instants], dtype='datetime64[ns]')
+
+    batch = to_time(ts, as_datetime64)
+    for i, dt in enumerate(instants):
+        assert abs(batch.tt[i] - to_time(ts, dt).tt) * 86400 < 1e-4
+        assert abs(to_time(ts, as_datetime64[i]).tt - to_time(ts, dt).tt) * 86400 < 1e-4
+    assert np.allclose(batch.tt, to_time(ts, instants).tt, rtol=0, atol=1e-4 / 86400)
+
+
+def test_naive_datetimes_are_rejected(ts):
+    with pytest.raises(ValueError):
+        to_time(ts, datetime(2026, 10, 18))
+    with pytest.raises(ValueError):
+        to_time(ts, [datetime(2026, 10, 18), datetime(2026, 10, 18) + timedelta(hours=1)])
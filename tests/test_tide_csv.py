@@ -0,0 +1,84 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+for module in ("pandas", "requests", "pytz", "utide", "sklearn"):
+    pytest.importorskip(module)
+
+from tides.tides import TideStation, parse_tide_csv, download_tide_data, load_tide_store
+
+HEADER = "time,station_id,Water_Level_LAT"
+UNITS = "UTC,,meters"
+
+
+def csv_lines(times, heights):
+    """ERDDAP style CSV lines: header, units row, then one row per observation."""
+    rows = [HEADER, UNITS]
+    for t, h in zip(times, heights):
+        height = "NaN" if h is None else f"{h:.3f}"
+        rows.append(f"{np.datetime_as_string(t, unit='s')}Z,Dublin Port,{height}")
+    return rows
+
+
+def write_csv(path, times, heights):
+    path.write_text("\n".join(csv_lines(times, heights)) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def recent_times(now, start_minutes_ago, count):
+    return now - np.timedelta64(start_minutes_ago, 'm') + np.arange(count) * np.timedelta64(5, 'm')
+
+
+def test_parse_drops_missing_heights_and_grows_past_chunks():
+    times = np.datetime64('2024-01-01T00:00') + np.arange(25) * np.timedelta64(5, 'm')
+    heights = [None if i % 7 == 3 else 2 + np.sin(i / 4) for i in range(25)]
+    lines = csv_lines(times, heights)
+    lines.insert(5, f"{np.datetime_as_string(times[2], unit='s')}Z,Dublin Port,")  # empty height
+
+    parsed_times, parsed_heights = parse_tide_csv(lines, expected_rows=2, chunk_rows=4)
+
+    keep = [i for i, h in enumerate(heights) if h is not None]
+    assert parsed_times.dtype == np.dtype('datetime64[ns]')
+    assert np.array_equal(parsed_times, times[keep].astype('datetime64[ns]'))
+    assert np.allclose(parsed_heights, [heights[i] for i in keep], atol=1e-3)
+    assert not np.isnan(parsed_heights).any()
+
+
+def test_parse_empty_input():
+    times, heights = parse_tide_csv([])
+    assert len(times) == 0 and len(heights) == 0
+
+
+def test_download_appends_only_newer_rows(tmp_path):
+    station = TideStation("Test Gauge", 53.35, data_dir=str(tmp_path / "station"))
+    now = np.datetime64('now', 'm')
+
+    first_times = recent_times(now, 240, 24)  # 4h ago to 2h ago
+    first_heights = [2 + np.sin(i / 2) for i in range(24)]
+    first_heights[5] = None
+    df = download_tide_data(full_refresh=True, source=write_csv(tmp_path / "first.csv", first_times, first_heights), station=station)
+    assert len(df) == 23
+    assert not df["Water_Level_LAT"].isna().any()
+
+    # the next export overlaps the stored rows and adds an hour of new ones, one of them missing
+    second_times = recent_times(now, 180, 24)  # 3h ago to 1h ago
+    second_heights = [2 + np.sin((i + 12) / 2) for i in range(24)]
+    second_heights[20] = None
+    df = download_tide_data(redownload=True, source=write_csv(tmp_path / "second.csv", second_times, second_heights), station=station)
+
+    stored_times, stored_heights = load_tide_store(station)
+    last_first = first_times[-1].astype('datetime64[ns]')
+    appended = stored_times[stored_times > last_first]
+    assert len(stored_times) == 23 + 11  # 12 rows after the first export's last one, minus the NaN
+    assert np.all(np.diff(stored_times.astype('int64')) > 0)  # sorted, no duplicates
+    assert len(appended) == 11
+    assert not np.isnan(stored_heights).any()
+    assert len(df) == len(stored_times)
+
+
+def test_download_without_redownload_reads_the_store(tmp_path):
+    station = TideStation("Test Gauge", 53.35, data_dir=str(tmp_path / "station"))
+    times = recent_times(np.datetime64('now', 'm'), 120, 12)
+    download_tide_data(full_refresh=True, source=write_csv(tmp_path / "a.csv", times, [2.0 + i / 10 for i in range(12)]), station=station)
+
+    df = download_tide_data(source=str(tmp_path / "missing.csv"), station=station)  # source isn't touched
+    assert len(df) == 12
@@ -0,0 +1,158 @@
+import asyncio
+import time
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+pytest.importorskip("dotenv")
+pytest.importorskip("pytz")
+pytest.importorskip("requests")
+from aiohttp import web
+
+from weather.weather import WeatherClient, WeatherCache
+
+
+class StubServer:
+    """Local stand-in for the OpenWeatherMap API. responses is a list of (status, body) served in order."""
+
+    def __init__(self, responses=None, delay=0.0):
+        self.responses = list(responses or [])
+        self.delay = delay
+        self.calls = 0
+
+    async def handle(self, request):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.responses:
+            status, body = self.responses.pop(0)
+        else:
+            status, body = 200, {"n": self.calls}
+        if status == 200:
+            return web.json_response(body)
+        return web.Response(status=status, text=str(body))
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get('/data/2.5/{endpoint}', self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}/data/2.5/"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.runner.cleanup()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_fetches_are_coalesced():
+    async def scenario():
+        async with StubServer(delay=0.1) as server:
+            client = WeatherClient(base_url=server.base_url, api_key="test")
+            try:
+                results = await asyncio.gather(*(client.fetch("weather", 53.3, -6.1) for _ in range(5)))
+            finally:
+                await client.close()
+            return server.calls, results
+
+    calls, results = run(scenario())
+    assert calls == 1
+    assert results == [{"n": 1}] * 5
+
+
+def test_retries_server_errors_then_succeeds():
+    async def scenario():
+        async with StubServer([(503, "busy"), (429, "slow down"), (200, {"ok": True})]) as server:
+            client = WeatherClient(base_url=server.base_url, api_key="test", backoff=0.01)
+            try:
+                result = await client.fetch("forecast", 53.3, -6.1)
+            finally:
+                await client.close()
+            return server.calls, result
+
+    calls, result = run(scenario())
+    assert calls == 3
+    assert result == {"ok": True}
+
+
+def test_client_errors_are_not_retried():
+    async def scenario():
+        async with StubServer([(401, "bad key")]) as server:
+            client = WeatherClient(base_url=server.base_url, api_key="test", backoff=0.01)
+            try:
+                with pytest.raises(RuntimeError, match="401"):
+                    await client.fetch("weather", 53.3, -6.1)
+            finally:
+                await client.close()
+            return server.calls
+
+    assert run(scenario()) == 1
+
+
+def test_stale_entries_are_served_while_revalidating(tmp_path):
+    async def scenario():
+        async with StubServer() as server:
+            client = WeatherClient(base_url=server.base_url, api_key="test")
+            cache = WeatherCache(client, ttl={"weather": 60}, cache_dir=str(tmp_path))
+            try:
+                first = await cache.get("weather", 53.3, -6.1)
+                assert await cache.get("weather", 53.3, -6.1) == first  # fresh hit, no request
+                assert server.calls == 1
+
+                key = ("weather", 53.3, -6.1)
+                cache._entries[key] = (time.time() - 120, first)  # past its TTL, within max_stale
+                stale = await cache.get("weather", 53.3, -6.1)
+                await asyncio.gather(*cache._refreshing.values())
+                refreshed = await cache.get("weather", 53.3, -6.1)
+            finally:
+                await client.close()
+            return first, stale, refreshed, server.calls, cache.stats
+
+    first, stale, refreshed, calls, stats = run(scenario())
+    assert first == {"n": 1}
+    assert stale == first
+    assert refreshed == {"n": 2}
+    assert calls == 2
+    assert stats["stale_hits"] == 1
+    assert stats["refreshes"] == 2
+
+
+def test_cache_falls_back_to_disk_when_fetch_fails(tmp_path):
+    async def scenario():
+        async with StubServer([(200, {"n": 1})] + [(500, "down")] * 10) as server:
+            client = WeatherClient(base_url=server.base_url, api_key="test", backoff=0.01, retries=1)
+            cache = WeatherCache(client, ttl={"weather": 60}, max_stale=0, cache_dir=str(tmp_path))
+            try:
+                await cache.get("weather", 53.3, -6.1)
+                restarted = WeatherCache(client, ttl={"weather": 0}, max_stale=0, cache_dir=str(tmp_path))
+                return await restarted.get("weather", 53.3, -6.1), restarted.stats
+            finally:
+                await client.close()
+
+    payload, stats = run(scenario())
+    assert payload == {"n": 1}
+    assert stats["errors"] == 1
+
+
+def test_refresh_skips_fresh_and_stale_entries(tmp_path):
+    async def scenario():
+        async with StubServer() as server:
+            client = WeatherClient(base_url=server.base_url, api_key="test")
+            cache = WeatherCache(client, ttl={"forecast": 600}, cache_dir=str(tmp_path))
+            try:
+                await cache.get("forecast", 53.3, -6.1)
+                before = cache.fetched_at("forecast", 53.3, -6.1)
+                refreshed = await cache.get("forecast", 53.3, -6.1, refresh=True)
+                return refreshed, server.calls, before, cache.fetched_at("forecast", 53.3, -6.1)
+            finally:
+                await client.close()
+
+    refreshed, calls, before, after = run(scenario())
+    assert refreshed == {"n": 2}
+    assert calls == 2
+    assert after >= before
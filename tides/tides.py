@@ -6,64 +6,274 @@ import pickle
 from urllib.parse import quote
 import numpy as np
 from utide import solve, reconstruct
-import io
+from utide.harmonics import ut_E
+from utide._time_conversion import _normalize_time
+import copy
+import json
+import threading
 import pytz
 
 from sklearn.metrics import mean_squared_error
 from itertools import product
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 
 STATION_NAME = "Dublin Port"
 ERDDAP_URL = "https://erddap.marine.ie/erddap/tabledap/IrishNationalTideGaugeNetwork.csv"
 MODEL_FILE = "tide_model.pkl"
 DAYS_LOOKBACK = 90
-DATA_FILE = 'data.csv'
+DATA_FILE = 'data.csv'  # legacy cache, migrated into the .npy store
+DATA_TIMES_FILE = 'tide_times.npy'
+DATA_HEIGHTS_FILE = 'tide_heights.npy'
+DATA_STATS_FILE = 'tide_stats.json'
 IRELAND_TZ = pytz.timezone("Europe/Dublin")
-
-def download_tide_data(redownload=False):
-    if not redownload and os.path.exists(DATA_FILE):
+PREDICTION_OFFSET = np.timedelta64(6, 'm')
+GRID_FILE = 'tide_grid.npy'
+GRID_META_FILE = 'tide_grid.json'
+GRID_DAYS = 14
+GRID_STEP = np.timedelta64(1, 'm')
+STATION_LAT = 53.35  # Dublin Port approx latitude
+DEFAULT_CONFIG = {"nodal": True, "trend": True, "method": 'ols', "conf_int": 'none', "Rayleigh_min": 0.95}
+CONFIG_FILE = 'tide_config.json'
+SEARCH_CACHE_FILE = 'config_search.json'
+SEARCH_RESULTS_FILE = 'config_results.csv'
+STATIONS_DIR = 'tide_stations'
+
+
+class TideStation:
+    """
+    An ERDDAP tide gauge and where its data, model and grid files live. The
+    default station keeps the original file names in the working directory;
+    any other station gets its own folder under STATIONS_DIR.
+    """
+
+    def __init__(self, name: str = STATION_NAME, lat: float = STATION_LAT, data_dir: str = None):
+        self.name = name
+        self.lat = lat
+        if data_dir is None:
+            data_dir = '.' if name == STATION_NAME else os.path.join(STATIONS_DIR, name.lower().replace(' ', '_'))
+        self.data_dir = data_dir
+
+    def path(self, filename):
+        return os.path.join(self.data_dir, filename)
+
+    def ensure_dir(self):
+        os.makedirs(self.data_dir, exist_ok=True)
+
+
+DEFAULT_STATION = TideStation()
+
+def load_tide_store(station=None):
+    """
+    Stored observations as memory-mapped (times, heights) arrays, or None.
+    times are naive UTC datetime64[ns]. An old data.csv cache is migrated on first use.
+    """
+    station = station if station is not None else DEFAULT_STATION
+    times_file, heights_file = station.path(DATA_TIMES_FILE), station.path(DATA_HEIGHTS_FILE)
+    if not (os.path.exists(times_file) and os.path.exists(heights_file)):
+        if not os.path.exists(station.path(DATA_FILE)):
+            return None
+        print("Migrating tide data from CSV cache...")
+        df = pd.read_csv(station.path(DATA_FILE), parse_dates=['time'], index_col='time')
+        heights = df["Water_Level_LAT"].values.astype(np.float64)
+        save_tide_store(to_utc_times(df.index), heights, station)
+        _save_stats(_update_stats(None, heights), station)
+
+    times = np.load(times_file, mmap_mode='r')
+    heights = np.load(heights_file, mmap_mode='r')
+    return times, heights
+
+def save_tide_store(times, heights, station=None):
+    station = station if station is not None else DEFAULT_STATION
+    station.ensure_dir()
+    for path, values in ((station.path(DATA_TIMES_FILE), times), (station.path(DATA_HEIGHTS_FILE), heights)):
+        with open(path + '.tmp', 'wb') as f:
+            np.save(f, np.asarray(values))
+        os.replace(path + '.tmp', path)
+
+def _store_frame(times, heights):
+    return pd.DataFrame({"Water_Level_LAT": heights}, index=pd.DatetimeIndex(times, name='time'))
+
+def _load_stats(station):
+    path = station.path(DATA_STATS_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _save_stats(stats, station):
+    with open(station.path(DATA_STATS_FILE), 'w') as f:
+        json.dump(stats, f)
+
+def _update_stats(stats, values):
+    """Fold a batch into running count/mean/M2 (Chan et al. parallel variance)."""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return stats
+    count, mean, m2 = len(values), float(values.mean()), float(((values - values.mean()) ** 2).sum())
+    if not stats:
+        return {"count": count, "mean": mean, "m2": m2}
+    total = stats["count"] + count
+    delta = mean - stats["mean"]
+    return {
+        "count": total,
+        "mean": stats["mean"] + delta * count / total,
+        "m2": stats["m2"] + m2 + delta ** 2 * stats["count"] * count / total,
+    }
+
+def _outlier_mask(heights, stats, z_thresh=3):
+    """True for heights to keep. Uses the running stats, or the batch itself when there are none yet."""
+    if stats and stats["count"] > 1:
+        mean, std = stats["mean"], np.sqrt(stats["m2"] / (stats["count"] - 1))
+    else:
+        mean, std = heights.mean(), heights.std(ddof=1)
+    if not std > 0:
+        return np.ones(len(heights), dtype=bool)
+    return np.abs(heights - mean) / std < z_thresh
+
+def parse_tide_csv(lines, expected_rows=0, chunk_rows=8192):
+    """
+    Stream an ERDDAP tide CSV (header row, units row, then data) into
+    (times, heights) arrays without holding the text in memory.
+
+    Rows are buffered chunk_rows at a time, converted to NumPy in one go and
+    copied into preallocated arrays that double when full. Rows with a missing
+    height are dropped as they are read. lines can be any iterable of text
+    lines, e.g. an open file or response.iter_lines(decode_unicode=True).
+    """
+    lines = iter(lines)
+    header = next(lines, None)
+    if header is None:
+        return np.array([], dtype='datetime64[ns]'), np.array([], dtype=np.float64)
+    columns = [c.strip() for c in header.split(',')]
+    time_col, height_col = columns.index('time'), columns.index('Water_Level_LAT')
+    next(lines, None)  # units row
+
+    capacity = max(int(expected_rows), chunk_rows)
+    times = np.empty(capacity, dtype='datetime64[ns]')
+    heights = np.empty(capacity, dtype=np.float64)
+    n = 0
+    chunk_times, chunk_heights = [], []
+
+    def flush():
+        nonlocal times, heights, n
+        count = len(chunk_times)
+        if n + count > len(times):
+            new_capacity = max(2 * len(times), n + count)
+            times = np.concatenate([times[:n], np.empty(new_capacity - n, dtype=times.dtype)])
+            heights = np.concatenate([heights[:n], np.empty(new_capacity - n, dtype=heights.dtype)])
+        times[n:n + count] = np.array(chunk_times, dtype='datetime64[ns]')
+        heights[n:n + count] = np.array(chunk_heights, dtype=np.float64)
+        n += count
+        chunk_times.clear()
+        chunk_heights.clear()
+
+    for line in lines:
+        if not line:
+            continue
+        fields = line.split(',')
+        height = fields[height_col].strip()
+        if not height or height == 'NaN':
+            continue
+        chunk_times.append(fields[time_col].strip().rstrip('Z'))
+        chunk_heights.append(height)
+        if len(chunk_times) >= chunk_rows:
+            flush()
+    flush()
+
+    return times[:n], heights[:n]
+
+def _fetch_tide_rows(time_start, time_end, source=None, station=None):
+    """
+    Observations with time_start < t < time_end as (times, heights) arrays, NaNs
+    dropped. source can be a local CSV file standing in for ERDDAP.
+    Returns None if the request failed.
+    """
+    station = station if station is not None else DEFAULT_STATION
+    expected_rows = int((time_end - time_start) / np.timedelta64(5, 'm'))
+
+    if source is not None:
+        with open(source, 'r', encoding='utf-8') as f:
+            times, heights = parse_tide_csv(f, expected_rows)
+    else:
+        query = (
+            f"?{quote('time,station_id,Water_Level_LAT')}"
+            f"&station_id=%22{quote(station.name)}%22"
+            f"&time%3E={quote(np.datetime_as_string(time_start, unit='s'))}Z"
+            f"&time%3C={quote(np.datetime_as_string(time_end, unit='s'))}Z"
+        )
+
+        url = ERDDAP_URL + query
+        with requests.get(url, timeout=60, stream=True) as response:
+            if response.status_code == 404 and 'no matching results' in response.text.lower():
+                return np.array([], dtype='datetime64[ns]'), np.array([], dtype=np.float64)
+            if response.status_code != 200:
+                print(f"Failed to fetch data: {response.status_code}")
+                return None
+
+            response.encoding = response.encoding or 'utf-8'
+            times, heights = parse_tide_csv(response.iter_lines(decode_unicode=True), expected_rows)
+
+    keep = (times > time_start) & (times < time_end)
+    times, heights = times[keep], heights[keep]
+    if len(times) > 1 and np.any(times[1:] < times[:-1]):
+        order = np.argsort(times, kind='stable')
+        times, heights = times[order], heights[order]
+    return times, heights
+
+def download_tide_data(redownload=False, full_refresh=False, source=None, station=None):
+    """
+    Tide observations for the last DAYS_LOOKBACK days as a DataFrame.
+
+    Without redownload this is just a memory-mapped load of the local store.
+    With it, only rows newer than the last stored one are fetched, filtered
+    against running statistics, appended, and anything older than the
+    lookback window is trimmed. full_refresh ignores the store and starts over.
+    source is passed through to _fetch_tide_rows (a local CSV instead of ERDDAP).
+    """
+    station = station if station is not None else DEFAULT_STATION
+    store = None if full_refresh else load_tide_store(station)
+    if not redownload and store is not None:
         print("Loading tide data from local cache...")
-        df = pd.read_csv(DATA_FILE, parse_dates=['time'], index_col='time')
-        return df
+        return _store_frame(*store)
 
-    print("Downloading recent tide data...")
-    time_end = datetime.now(IRELAND_TZ)
-    time_start = time_end - timedelta(days=DAYS_LOOKBACK)
-    
-    query = (
-        f"?{quote('time,station_id,Water_Level_LAT')}"
-        f"&station_id=%22{quote(STATION_NAME)}%22"
-        f"&time%3E={quote(time_start.isoformat())}Z"
-        f"&time%3C={quote(time_end.isoformat())}Z"
-    )
-    
-    url = ERDDAP_URL + query
-    response = requests.get(url)
-    
-    if response.status_code != 200:
-        print(f"Failed to fetch data: {response.status_code}")
+    time_end = np.datetime64('now', 'ns')
+    window_start = time_end - np.timedelta64(DAYS_LOOKBACK, 'D')
+    has_data = store is not None and len(store[0]) > 0
+    time_start = max(store[0][-1], window_start) if has_data else window_start
+
+    print(f"Downloading tide data since {time_start}...")
+    fetched = _fetch_tide_rows(time_start, time_end, source, station)
+
+    if fetched is None:
         print("Attempting to reach local cache...")
-        if os.path.exists(DATA_FILE):
+        if store is not None:
             print("Loading tide data from local cache...")
-            df = pd.read_csv(DATA_FILE, parse_dates=['time'], index_col='time')
-            return df
+            return _store_frame(*store)
         else: print("no cache found, exiting")
         return None
 
-    df = pd.read_csv(io.StringIO(response.text), skiprows=[1])
-    
-    if df.empty:
+    new_times, new_heights = fetched
+    stats = _load_stats(station) if has_data else None
+    keep = _outlier_mask(new_heights, stats) if len(new_heights) else np.ones(0, dtype=bool)
+    print(f"Downloaded {len(new_heights)} new rows of tide data, removed {int((~keep).sum())} outliers.")
+    new_times, new_heights = new_times[keep], new_heights[keep]
+
+    if has_data:
+        times = np.concatenate([store[0], new_times])
+        heights = np.concatenate([store[1], new_heights])
+    else:
+        times, heights = new_times, new_heights
+
+    in_window = times >= window_start
+    times, heights = times[in_window], heights[in_window]
+    if len(times) == 0:
         print("No data found for the given time range.")
         return None
 
-    df['time'] = pd.to_datetime(df['time'])
-    df = df.dropna(subset=["Water_Level_LAT"])
-    df.set_index('time', inplace=True)
-    print(f"Downloaded {len(df)} rows of tide data.")
-
-    df = remove_outliers(df)
-    df.to_csv(DATA_FILE)
-    return df
+    save_tide_store(times, heights, station)
+    _save_stats(_update_stats(stats, new_heights), station)
+    return _store_frame(times, heights)
 
 def remove_outliers(df, z_thresh=3):
     """Remove tide height outliers using Z-score thresholding."""
@@ -75,8 +285,18 @@ def remove_outliers(df, z_thresh=3):
     print(f"Removed {len(df) - len(filtered_df)} outliers from data")
     return filtered_df
 
-def fit_tide_model(df):
-    print("Fitting harmonic model with UTide...")
+def load_best_config(station=None):
+    """The configuration chosen by the last test_all_configs run, or DEFAULT_CONFIG."""
+    station = station if station is not None else DEFAULT_STATION
+    if os.path.exists(station.path(CONFIG_FILE)):
+        with open(station.path(CONFIG_FILE), 'r') as f:
+            return {**DEFAULT_CONFIG, **json.load(f)}
+    return dict(DEFAULT_CONFIG)
+
+def fit_tide_model(df, config=None, station=None):
+    config = config if config is not None else DEFAULT_CONFIG
+    station = station if station is not None else DEFAULT_STATION
+    print(f"Fitting harmonic model with UTide ({config})...")
     
     times = df.index.values
     heights = df["Water_Level_LAT"].values
@@ -91,58 +311,409 @@ def fit_tide_model(df):
     # plt.tight_layout()
     # plt.savefig("figreal.png")
 
-    coef = solve(
-        times,
-        heights,
-        # lat=53.34,  # Dublin Port approx latitude
-        lat=53.35,
-        nodal=True,
-        trend=True,
-        method='ols',
-        conf_int='none',
-        Rayleigh_min=0.95,
-    )
+    coef = solve(times, heights, lat=station.lat, **config)
 
     print("Harmonic model fitted successfully.")
-    return {"coef": coef, "t0": df.index[0]}
+    normal = _empty_normal(coef)
+    _accumulate_normal(normal, coef, times, heights)
+    return {"coef": coef, "t0": df.index[0], "config": dict(config), "normal": normal}
+
+# Incremental refits reuse utide's own basis (nodal corrections included) for the
+# constituents picked by the last full solve, written as a real least squares
+# problem: h = sum(2 Re(ap E)) + mean [+ slope (t - reftime)], unknowns Re/Im(ap).
+
+def _design_matrix(times, coef):
+    aux = coef['aux']
+    opt = aux['opt']
+    t = _normalize_time(np.asarray(times), opt['epoch'])
+    ngflgs = [opt['nodsatlint'], opt['nodsatnone'], opt['gwchlint'], opt['gwchnone']]
+    E = ut_E(t, aux['reftime'], aux['frq'], aux['lind'], aux['lat'], ngflgs, opt['prefilt'])
+
+    columns = [2 * E.real, -2 * E.imag, np.ones((len(t), 1))]
+    if not opt['notrend']:
+        columns.append((t - aux['reftime'])[:, None])
+    return np.hstack(columns)
+
+def _empty_normal(coef):
+    size = 2 * len(coef['name']) + (1 if coef['aux']['opt']['notrend'] else 2)
+    return {"xtx": np.zeros((size, size)), "xty": np.zeros(size), "count": 0, "last_time": None}
+
+def _accumulate_normal(normal, coef, times, heights, chunk_rows=8192):
+    """Rank update of the XᵀX / Xᵀy accumulators with new observations, in place."""
+    times = np.asarray(times, dtype='datetime64[ns]')
+    heights = np.asarray(heights, dtype=np.float64)
+    for i in range(0, len(times), chunk_rows):
+        X = _design_matrix(times[i:i + chunk_rows], coef)
+        normal["xtx"] += X.T @ X
+        normal["xty"] += X.T @ heights[i:i + chunk_rows]
+    if len(times):
+        last = times.max()
+        normal["count"] += len(times)
+        normal["last_time"] = last if normal["last_time"] is None else max(normal["last_time"], last)
+
+def _solve_normal(coef, normal):
+    m = np.linalg.lstsq(normal["xtx"], normal["xty"], rcond=None)[0]
+    nc = len(coef['name'])
+    ap = m[:nc] + 1j * m[nc:2 * nc]
+
+    coef = copy.deepcopy(coef)
+    coef['A'] = 2 * np.abs(ap)
+    coef['g'] = np.degrees(-np.angle(ap)) % 360
+    coef['mean'] = m[2 * nc]
+    if not coef['aux']['opt']['notrend']:
+        coef['slope'] = m[2 * nc + 1]
+
+    # The normal equations give no confidence intervals. reconstruct would otherwise pick
+    # constituents by SNR from the new amplitudes and the full fit's A_ci, so mark the
+    # diagnostics as absent and have it use every constituent in the fit.
+    coef['aux']['opt']['nodiagn'] = True
+    for key in ('A_ci', 'g_ci'):
+        if key in coef:
+            coef[key] = np.full_like(coef[key], np.nan)
+    coef.pop('diagn', None)
+    return coef
+
+def refit_tide_model(model, df):
+    """
+    Fold any rows of df newer than the model's last observation into its normal
+    equations and re-solve, keeping the constituent set fixed. Only the new
+    rows are touched. Returns the updated model, or None when it needs a full
+    rebuild: the model predates incremental fitting, or was fitted with a
+    method other than OLS, which the normal equations can't reproduce.
+    """
+    normal = model.get("normal")
+    if normal is None:
+        return None
+    if model.get("config", {}).get("method", "ols") != "ols":
+        print(f"Model was fitted with method={model['config']['method']!r}, doing a full refit instead.")
+        return None
+
+    times = df.index.values
+    heights = df["Water_Level_LAT"].values
+    if normal["last_time"] is not None:
+        new = times > normal["last_time"]
+        times, heights = times[new], heights[new]
+
+    normal = {**normal, "xtx": normal["xtx"].copy(), "xty": normal["xty"].copy()}
+    _accumulate_normal(normal, model["coef"], times, heights)
+    print(f"Refitting harmonic model with {len(times)} new observations...")
+    return {**model, "coef": _solve_normal(model["coef"], normal), "normal": normal}
+
+def to_utc_times(dt):
+    """
+    Normalise a datetime, list of datetimes, datetime64 array or DatetimeIndex to
+    naive UTC datetime64[ns] in one vectorised step. Naive inputs are taken as UTC.
+    """
+    if not isinstance(dt, pd.DatetimeIndex):
+        dt = pd.to_datetime(np.atleast_1d(dt), utc=True)
+    elif dt.tz is None:
+        dt = dt.tz_localize(pytz.UTC)
+    return pd.DatetimeIndex(dt).tz_convert(pytz.UTC).tz_localize(None).values
+
+def predict_tide(dt, model=None, holder=None):
+    """Heights at dt. holder picks the station's TideModelHolder (default Dublin Port)."""
+    times = to_utc_times(dt)
+    holder = holder if holder is not None else _model_holder
+
+    if model is None:
+        grid = holder.grid()
+        if grid is not None and grid.covers(times):
+            return grid.interpolate(times)
 
-def predict_tide(dt, model=None):
-    model = model if model is not None else get_or_create_model()
+    model = model if model is not None else holder.get()
     if model is None:
         print("Unable to proceed without a valid harmonic model.")
         return
 
-    if isinstance(dt, (list, np.ndarray)):  # If it's a list or array, process each item
-        dt = [
-            pd.to_datetime(t).tz_localize(pytz.UTC) + timedelta(minutes=6)
-            if pd.to_datetime(t).tzinfo is None
-            else t + timedelta(minutes=6)
-            for t in dt
-        ]
-    else:  # If it's a single datetime
-        dt = pd.to_datetime(dt).tz_localize(pytz.UTC) + timedelta(minutes=6) \
-            if pd.to_datetime(dt).tzinfo is None \
-            else dt + timedelta(minutes=6)
-    
-    return reconstruct(dt, model["coef"]).h
-
-def get_or_create_model():
-    # if False: #os.path.exists(MODEL_FILE):
-    if os.path.exists(MODEL_FILE):
-        print("Loading cached harmonic model...")
-        with open(MODEL_FILE, 'rb') as f:
-            model = pickle.load(f)
-    else:
-        df = download_tide_data()
-        if df is None:
+    return reconstruct(times + PREDICTION_OFFSET, model["coef"]).h
+
+def find_high_low(start, end, model=None, coarse_step=np.timedelta64(10, 'm'), holder=None):
+    """
+    Every high and low water between start and end, as (utc datetime, height, 'high'|'low').
+
+    The series is sampled on a coarse step in one predict_tide call and turning
+    points are taken where the slope changes sign. Each one is then refined with
+    a single batched 1-minute sample around all candidates and a parabolic fit.
+    """
+    t0, t1 = to_utc_times([start, end])
+    # one extra step either side so turns right at the edges still show a sign change, trimmed below
+    coarse = np.arange(t0 - coarse_step, t1 + 2 * coarse_step, coarse_step)
+    heights = predict_tide(coarse, model, holder)
+    if heights is None:
+        return []
+
+    slope = np.sign(np.diff(heights))
+    turns = np.nonzero(slope[:-1] != slope[1:])[0] + 1
+    turns = turns[(slope[turns - 1] != 0) & (slope[turns] != 0)]
+    if len(turns) == 0:
+        return []
+
+    half_width = int(coarse_step / np.timedelta64(1, 'm'))
+    offsets = np.arange(-half_width, half_width + 1) * np.timedelta64(1, 'm')
+    fine = coarse[turns][:, None] + offsets[None, :]
+    fine_heights = np.asarray(predict_tide(fine.ravel(), model, holder)).reshape(fine.shape)
+
+    events = []
+    for row, (times, hs) in enumerate(zip(fine, fine_heights)):
+        is_high = slope[turns[row] - 1] > 0
+        i = int(np.argmax(hs) if is_high else np.argmin(hs))
+        i = min(max(i, 1), len(hs) - 2)
+        # vertex of the parabola through the three points around the extremum
+        y0, y1, y2 = hs[i - 1], hs[i], hs[i + 1]
+        denom = y0 - 2 * y1 + y2
+        shift = 0.5 * (y0 - y2) / denom if denom != 0 else 0.0
+        height = y1 - 0.25 * (y0 - y2) * shift
+        t = times[i] + np.timedelta64(int(shift * 60e9), 'ns')
+        if t0 <= t <= t1:
+            when = pd.Timestamp(t.astype('datetime64[us]')).tz_localize(pytz.UTC).to_pydatetime()
+            events.append((when, float(height), 'high' if is_high else 'low'))
+
+    return events
+
+_tide_tables = {}
+_tide_tables_lock = threading.Lock()  # tables are read and built from several service worker threads
+
+def tide_table(day=None, holder=None):
+    """High and low water for a local (Irish) calendar day, cached per station, day and model."""
+    day = day if day is not None else datetime.now(IRELAND_TZ).date()
+    holder = holder if holder is not None else _model_holder
+    if holder.get() is None:
+        return []
+    key = (holder.station.name, day, holder.version)
+    with _tide_tables_lock:
+        table = _tide_tables.get(key)
+    if table is not None:
+        return table
+
+    start = IRELAND_TZ.localize(datetime.combine(day, time()))
+    end = IRELAND_TZ.localize(datetime.combine(day + timedelta(days=1), time()))
+    table = find_high_low(start, end, holder=holder)
+    with _tide_tables_lock:
+        # old days and tables for replaced models are never asked for again
+        for k in [k for k in _tide_tables if k[0] == key[0] and (k[1] < day - timedelta(days=1) or k[2] != key[2])]:
+            del _tide_tables[k]
+        _tide_tables[key] = table
+    return table
+
+def drop_tide_tables(station_name):
+    """Forget cached tables for a station, e.g. when its location is evicted."""
+    with _tide_tables_lock:
+        for k in [k for k in _tide_tables if k[0] == station_name]:
+            del _tide_tables[k]
+
+class TideGrid:
+    """
+    Dense float32 table of predicted heights at a fixed step, answered by linear
+    interpolation. The heights live in a .npy file that is memory-mapped on
+    load; the start, step and error figures go in a small JSON sidecar.
+    """
+
+    def __init__(self, start, step, heights, max_error, model_mtime=None):
+        self.start = np.datetime64(start, 'ns')
+        self.step = np.timedelta64(step, 'ns')
+        self.heights = heights
+        self.max_error = max_error
+        self.model_mtime = model_mtime
+
+    @property
+    def end(self):
+        return self.start + self.step * (len(self.heights) - 1)
+
+    @classmethod
+    def build(cls, model, start, days=GRID_DAYS, step=GRID_STEP, model_mtime=None):
+        start = np.datetime64(start, 'ns')
+        step = np.timedelta64(step, 'ns')
+        times = start + step * np.arange(int(np.timedelta64(days, 'D') / step) + 1)
+        heights = reconstruct(times + PREDICTION_OFFSET, model["coef"]).h.astype(np.float32)
+        grid = cls(start, step, heights, 0.0, model_mtime)
+
+        # worst case error is between grid points, so check the midpoints
+        midpoints = times[:-1] + step / 2
+        exact = reconstruct(midpoints + PREDICTION_OFFSET, model["coef"]).h
+        grid.max_error = float(np.max(np.abs(grid.interpolate(midpoints) - exact)))
+        print(f"Built {days} day tide grid, max interpolation error {grid.max_error * 1000:.2f} mm")
+        return grid
+
+    def covers(self, times):
+        return len(times) > 0 and times.min() >= self.start and times.max() <= self.end
+
+    def interpolate(self, times):
+        x = (times - self.start) / self.step
+        return np.interp(x, np.arange(len(self.heights)), self.heights)
+
+    def save(self, path=GRID_FILE, meta_path=GRID_META_FILE):
+        # write to temp files and swap them in, another thread may still have the old grid mapped
+        with open(path + '.tmp', 'wb') as f:
+            np.save(f, self.heights)
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump({
+                "start": str(self.start),
+                "step_ns": int(self.step / np.timedelta64(1, 'ns')),
+                "max_error": self.max_error,
+                "model_mtime": self.model_mtime,
+            }, f)
+        os.replace(path + '.tmp', path)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    @classmethod
+    def load(cls, path=GRID_FILE, meta_path=GRID_META_FILE):
+        if not (os.path.exists(path) and os.path.exists(meta_path)):
+            return None
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        heights = np.load(path, mmap_mode='r')
+        return cls(meta["start"], np.timedelta64(meta["step_ns"], 'ns'), heights, meta["max_error"], meta["model_mtime"])
+
+class TideModelHolder:
+    """
+    Keeps the harmonic model in memory for the life of the process.
+
+    The pickle is only read when it changes: every get() compares the file's
+    mtime with the one that was loaded, so a model rebuilt by another process
+    is picked up without a restart. swap() installs a freshly fitted model and
+    writes it to disk atomically.
+    """
+
+    def __init__(self, station=None):
+        self.station = station if station is not None else DEFAULT_STATION
+        self.path = self.station.path(MODEL_FILE)
+        self._lock = threading.Lock()
+        self._model = None
+        self._mtime = None
+        self._grid = None
+        self._grid_lock = threading.Lock()
+
+    @property
+    def version(self):
+        """Changes whenever a different model is loaded or swapped in."""
+        return self._mtime
+
+    def _file_mtime(self):
+        try:
+            return os.path.getmtime(self.path)
+        except OSError:
             return None
-        model = fit_tide_model(df)
-        with open(MODEL_FILE, 'wb') as f:
+
+    def get(self):
+        mtime = self._file_mtime()
+        model = self._model
+        if model is not None and (mtime is None or mtime == self._mtime):
+            return model
+
+        with self._lock:
+            mtime = self._file_mtime()
+            if self._model is not None and (mtime is None or mtime == self._mtime):
+                return self._model
+
+            if mtime is not None:
+                print("Loading cached harmonic model...")
+                with open(self.path, 'rb') as f:
+                    self._model = pickle.load(f)
+                self._mtime = mtime
+                return self._model
+
+            df = download_tide_data(station=self.station)
+            if df is None:
+                return None
+            self._write(fit_tide_model(df, load_best_config(self.station), self.station))
+            return self._model
+
+    def _write(self, model):
+        self.station.ensure_dir()
+        tmp = self.path + '.tmp'
+        with open(tmp, 'wb') as f:
             pickle.dump(model, f)
-    return model
+        os.replace(tmp, self.path)
+        self._model = model
+        self._mtime = self._file_mtime()
+
+    def swap(self, model):
+        with self._lock:
+            self._write(model)
+
+    def _grid_is_fresh(self, grid):
+        # rebuild once less than a day of the window is left
+        horizon = np.datetime64('now', 'ns') + np.timedelta64(1, 'D')
+        return grid is not None and grid.model_mtime == self._mtime and grid.end >= horizon
+
+    def grid(self):
+        """The interpolation grid for the current model, built or reloaded as needed."""
+        if self.get() is None:
+            return None
+        grid = self._grid
+        if self._grid_is_fresh(grid):
+            return grid
+
+        with self._grid_lock:
+            if self._grid_is_fresh(self._grid):
+                return self._grid
+
+            grid_paths = (self.station.path(GRID_FILE), self.station.path(GRID_META_FILE))
+            grid = TideGrid.load(*grid_paths)
+            if not self._grid_is_fresh(grid):
+                start = np.datetime64(date.today() - timedelta(days=1), 'ns')
+                grid = TideGrid.build(self._model, start, model_mtime=self._mtime)
+                try:
+                    grid.save(*grid_paths)
+                except OSError as e:
+                    print(f"Failed to write tide grid: {e}")
+            self._grid = grid
+            return grid
+
+
+_model_holder = TideModelHolder()
 
-def test_all_configs(df):
+def get_or_create_model():
+    return _model_holder.get()
+
+def get_model_holder(station=None):
+    """The shared holder for the default station, or a new one for any other station."""
+    if station is None or station.name == DEFAULT_STATION.name:
+        return _model_holder
+    return TideModelHolder(station)
+
+def time_series_folds(n, n_folds=1, test_frac=0.25):
+    """
+    Expanding-window splits as (train_end, test_end) indices. With one fold it
+    is the plain 75/25 split; with more, each fold trains on everything before
+    its test block, and the test blocks tile the last test_frac of the data.
+    """
+    test_start = int(n * (1 - test_frac))
+    bounds = np.linspace(test_start, n, n_folds + 1).astype(int)
+    return [(int(bounds[i]), int(bounds[i + 1])) for i in range(n_folds)]
+
+def _config_key(config):
+    return json.dumps(config, sort_keys=True)
+
+_search_data = None
+
+def _init_search_worker(times, heights, lat):
+    global _search_data
+    _search_data = (times, heights, lat)
+
+def _score_config(config, folds):
+    times, heights, lat = _search_data
+    mse_train, mse_test = [], []
+    for train_end, test_end in folds:
+        coef = solve(times[:train_end], heights[:train_end], lat=lat, verbose=False, **config)
+        predicted_train = reconstruct(times[:train_end], coef, verbose=False).h
+        predicted_test = reconstruct(times[train_end:test_end], coef, verbose=False).h
+        mse_train.append(mean_squared_error(heights[:train_end], predicted_train))
+        mse_test.append(mean_squared_error(heights[train_end:test_end], predicted_test))
+    return float(np.mean(mse_train)), float(np.mean(mse_test))
+
+def test_all_configs(df, n_folds=1, max_workers=None, cache_file=SEARCH_CACHE_FILE, results_file=SEARCH_RESULTS_FILE, station=None):
+    """
+    Grid search over UTide solve options, fanned out over a process pool.
+
+    Each configuration's score is written to cache_file as soon as it finishes,
+    so an interrupted search picks up where it left off (the cache is tied to
+    the data and fold layout, and is discarded if those change). The ranked
+    table goes to results_file, the winner to CONFIG_FILE for rebuild_model,
+    and the winner refitted on all of df is returned.
+    """
     print("Testing all configurations for UTide...")
+    station = station if station is not None else DEFAULT_STATION
 
     # Define parameter options
     nodal_options = [True, False, 'linear_time']
@@ -151,74 +722,90 @@ def test_all_configs(df):
     conf_int_options = ['linear', 'MC', 'none']  # Confidence intervals or none
     r_min_options = [0.9,0.95,1.0]
 
+    configs = [
+        {"nodal": nodal, "trend": trend, "method": method, "conf_int": conf_int, "Rayleigh_min": r_min}
+        for nodal, trend, method, conf_int, r_min
+        in product(nodal_options, trend_options, method_options, conf_int_options, r_min_options)
+    ]
+
     # Prepare data
     times = df.index.values
     heights = df["Water_Level_LAT"].values
+    folds = time_series_folds(len(times), n_folds)
+    signature = f"{len(times)}|{times[0]}|{times[-1]}|{folds}"
+
+    cache = {"signature": signature, "scores": {}}
+    if os.path.exists(cache_file):
+        with open(cache_file, 'r') as f:
+            saved = json.load(f)
+        if saved.get("signature") == signature:
+            cache = saved
+            print(f"Resuming search, {len(cache['scores'])}/{len(configs)} configurations already scored")
+
+    def save_cache():
+        with open(cache_file + '.tmp', 'w') as f:
+            json.dump(cache, f)
+        os.replace(cache_file + '.tmp', cache_file)
+
+    pending = [c for c in configs if _config_key(c) not in cache["scores"]]
+    if pending:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_search_worker, initargs=(times, heights, station.lat)) as pool:
+            futures = {pool.submit(_score_config, config, folds): config for config in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                config = futures[future]
+                try:
+                    mse_train, mse_test = future.result()
+                    cache["scores"][_config_key(config)] = {"mse_train": mse_train, "mse_test": mse_test}
+                except Exception as e:
+                    print(f"Error fitting model for configuration {config}: {e}")
+                    cache["scores"][_config_key(config)] = {"mse_train": None, "mse_test": None, "error": str(e)}
+                save_cache()
+                print(f"[{done}/{len(pending)}] {config}")
+
+    results = pd.DataFrame([
+        {**json.loads(key), **score} for key, score in cache["scores"].items()
+    ]).dropna(subset=["mse_test"]).sort_values("mse_test").reset_index(drop=True)
+    results.to_csv(results_file, index_label="rank")
+
+    if results.empty:
+        print("No configuration could be fitted.")
+        return None
 
-    split_index = int(len(times) * 0.75)
-    train_times = times[:split_index]
-    train_heights = heights[:split_index]
-    test_times = times[split_index:]
-    test_heights = heights[split_index:]
-
-    # To store best MSE and configuration
-    best_mse = float('inf')
-    best_config = None
-    best_coef = None
-
-    # Loop through all combinations of parameters
-    for nodal, trend, method, conf_int, r_min in product(nodal_options, trend_options, method_options, conf_int_options, r_min_options):
-        print(f"Testing configuration: {nodal=}, {trend=}, {method=}, {conf_int=}, {r_min=}")
-
-        try:
-            # Fit the model with the current configuration
-            coef = solve(
-                train_times,
-                train_heights,
-                lat=53.585,
-                nodal=nodal,
-                trend=trend,
-                method=method,
-                conf_int=conf_int,
-                Rayleigh_min=r_min
-            )
-
-            # Reconstruct predicted heights using the model
-            predicted_heights_train = reconstruct(train_times, coef)
-            predicted_heights_test = reconstruct(test_times, coef)
-
-            # Calculate MSE for the current configuration
-            mse_train = mean_squared_error(train_heights, predicted_heights_train.h)
-            mse_test = mean_squared_error(test_heights, predicted_heights_test.h)
-
-            print(f"MSE (train set): {mse_train:.4f}")
-            print(f"MSE (test set): {mse_test:.4f}\n")
-
-            # If this configuration has a lower MSE, save it as the best
-            if mse_test < best_mse:
-                best_mse = mse_test
-                best_config = (nodal, trend, method, conf_int)
-                best_coef = coef
-
-        except Exception as e:
-            print(f"Error fitting model for configuration {nodal}, {trend}, {method}, {conf_int}: {e}")
-            continue
+    best = results.iloc[0]
+    best_config = {k: best[k] for k in DEFAULT_CONFIG}
+    best_config = {k: (v.item() if hasattr(v, 'item') else v) for k, v in best_config.items()}
 
     # Print the best configuration and MSE
-    print("\nBest configuration:")
-    print(f"nodal={best_config[0]}, trend={best_config[1]}, method={best_config[2]}, conf_int={best_config[3]}")
-    print(f"Best MSE: {best_mse:.4f}")
+    print("\nTop configurations:")
+    print(results.head(10).to_string())
+    print(f"\nBest configuration: {best_config}")
+    print(f"Best MSE: {best['mse_test']:.4f}")
 
-    # Return the best model
-    return {"coef": best_coef, "t0": df.index[0]}
+    station.ensure_dir()
+    with open(station.path(CONFIG_FILE), 'w') as f:
+        json.dump(best_config, f)
 
-def rebuild_model():
-    df = download_tide_data(redownload=True)
+    # Return the best model
+    return fit_tide_model(df, best_config, station)
+
+def rebuild_model(config=None, incremental=False, holder=None):
+    """
+    Fetch new data and refit. A full rebuild reselects constituents with
+    config or else the winner of the last test_all_configs search; incremental
+    only folds the new rows into the current model's normal equations.
+    """
+    holder = holder if holder is not None else _model_holder
+    station = holder.station
+    df = download_tide_data(redownload=True, station=station)
     if df is None: return False
-    model = fit_tide_model(df)
+    model = None
+    if incremental:
+        current = holder.get()
+        model = refit_tide_model(current, df) if current is not None else None
+    if model is None:
+        model = fit_tide_model(df, config if config is not None else load_best_config(station), station)
     if model is None: return False
-    with open(MODEL_FILE, 'wb') as f:
-        pickle.dump(model, f)
+    holder.swap(model)
     return True
 
 def main():
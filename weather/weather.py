@@ -1,7 +1,11 @@
 import os
 import json
+import time
+import asyncio
+import aiohttp
 import requests
-from datetime import datetime, timezone
+import numpy as np
+from datetime import datetime
 from dotenv import load_dotenv
 import pytz
 
@@ -13,6 +17,88 @@ OPENWEATHER_URL = "https://api.openweathermap.org/data/2.5/"
 IRELAND_TZ = pytz.timezone("Europe/Dublin")
 
 
+def parse_weather(entry) -> dict:
+    """Flatten an OpenWeatherMap current weather payload (or one forecast entry)."""
+    temp_max = entry['main']['temp_max']
+    temp_min = entry['main']['temp_min']
+    return {
+        "temperature": entry['main']['temp'],
+        "temp_margin": temp_max - temp_min,
+        "feels_like": entry['main']['feels_like'],
+        "weather": entry['weather'][0]['description'],
+        "wind_speed": entry['wind']['speed'],
+        "cloud_cover": entry['clouds']['all']
+    }
+
+FORECAST_FIELDS = ("temperature", "temp_margin", "feels_like", "wind_speed", "cloud_cover")
+
+
+class ForecastSeries:
+    """
+    A forecast payload parsed once into sorted NumPy arrays.
+
+    Lookups binary-search the slot times instead of scanning the list. By
+    default the nearest 3-hourly slot is returned; with interpolate=True the
+    numeric fields are linearly interpolated between the surrounding slots
+    (and held flat past either end), while the description comes from the
+    nearest slot.
+    """
+
+    def __init__(self, forecast):
+        entries = sorted(forecast["list"], key=lambda x: x["dt"])
+        parsed = [parse_weather(e) for e in entries]
+        self.times = np.array([e["dt"] for e in entries], dtype=np.float64)
+        self.values = {field: np.array([p[field] for p in parsed], dtype=np.float64) for field in FORECAST_FIELDS}
+        self.descriptions = [p["weather"] for p in parsed]
+
+    def _nearest(self, ts):
+        if len(self.times) == 1:
+            return np.zeros(len(ts), dtype=int)
+        i = np.clip(np.searchsorted(self.times, ts), 1, len(self.times) - 1)
+        # ties go to the earlier slot
+        return np.where(ts - self.times[i - 1] <= self.times[i] - ts, i - 1, i)
+
+    def batch(self, targets, interpolate: bool = False) -> list[tuple[datetime, dict]]:
+        ts = np.array([t.timestamp() for t in targets], dtype=np.float64)
+        nearest = self._nearest(ts)
+
+        if interpolate:
+            columns = {field: np.interp(ts, self.times, values) for field, values in self.values.items()}
+            dts = [t.astimezone(IRELAND_TZ) for t in targets]
+        else:
+            columns = {field: values[nearest] for field, values in self.values.items()}
+            dts = [datetime.fromtimestamp(t, tz=IRELAND_TZ) for t in self.times[nearest]]
+
+        results = []
+        for k, dt in enumerate(dts):
+            forecast_dict = {field: float(columns[field][k]) for field in FORECAST_FIELDS}
+            forecast_dict["cloud_cover"] = int(round(forecast_dict["cloud_cover"]))
+            forecast_dict["weather"] = self.descriptions[nearest[k]]
+            results.append((dt, forecast_dict))
+        return results
+
+    def at(self, target_dt, interpolate: bool = False) -> tuple[datetime, dict]:
+        return self.batch([target_dt], interpolate)[0]
+
+
+_series_cache = {}
+
+def forecast_series(forecast) -> ForecastSeries:
+    """Parsed ForecastSeries for a payload, reused while the same payload object is in use."""
+    cached = _series_cache.get(id(forecast))
+    if cached is not None and cached[0] is forecast:
+        return cached[1]
+    series = ForecastSeries(forecast)
+    if len(_series_cache) >= 8:
+        _series_cache.clear()
+    _series_cache[id(forecast)] = (forecast, series)
+    return series
+
+def forecast_entry_at(forecast, target_dt, interpolate: bool = False) -> tuple[datetime, dict]:
+    """The forecast at target_dt, either the closest 3-hourly slot or interpolated."""
+    return forecast_series(forecast).at(target_dt, interpolate)
+
+
 class Weather:
     def __init__(self):
         self.lat = 53.29395
@@ -20,7 +106,7 @@ class Weather:
         self._recent_weather = None
         self._recent_forecast = None
         self._weather_cache_file = "weather.json"
-        self._forecast_cache_file = "weather.json"
+        self._forecast_cache_file = "forecast.json"
 
     def _grab_weather(self):
         params = {
@@ -66,74 +152,17 @@ class Weather:
         with open(self._forecast_cache_file, "w") as f:
             json.dump(self._recent_forecast, f)
 
-    def weather_at(self, target_dt) -> tuple[datetime, str]:
+    def weather_at(self, target_dt, interpolate: bool = False) -> tuple[datetime, dict]:
         self._grab_forecast()
-        target_dt_utc = target_dt.astimezone(timezone.utc)
-
-        closest_entry = min(
-            self._recent_forecast["list"],
-            key=lambda x: abs(datetime.fromtimestamp(x["dt"], tz=timezone.utc) - target_dt_utc)
-        )
-
-        dt = datetime.fromtimestamp(closest_entry["dt"], tz=IRELAND_TZ)
-        temp = closest_entry["main"]["temp"]    
-        temp_max = closest_entry["main"]["temp_max"]
-        temp_min = closest_entry["main"]["temp_min"]
-        feels_like = closest_entry["main"]["feels_like"]
-        desc = closest_entry["weather"][0]["description"]
-        wind = closest_entry["wind"]["speed"]
-        clouds = closest_entry["clouds"]["all"]
-
-        # temp_str = f"{temp}±{(temp_max - temp_min):.1f}"
-
-        forecast_dict = {
-            "temperature": temp,
-            "temp_margin": temp_max - temp_min,
-            "feels_like": feels_like,
-            "weather": desc,
-            "wind_speed": wind,
-            "cloud_cover": clouds
-        }
-
-        return dt, forecast_dict
+        return forecast_entry_at(self._recent_forecast, target_dt, interpolate)
 
-        # return dt, (
-        #     f"Temperature: {temp_str} °C, fl. {feels_like} °C\n"
-        #     f"Weather: {desc}\n"
-        #     f"Wind Speed: {wind} m/s\n"
-        #     f"Cloud Cover: {clouds}%"
-        # )
+    def weather_at_many(self, targets, interpolate: bool = False) -> list[tuple[datetime, dict]]:
+        self._grab_forecast()
+        return forecast_series(self._recent_forecast).batch(targets, interpolate)
     
     def weather_now(self):
         self._grab_weather()
-
-        temp = self._recent_weather['main']['temp']
-        temp_max = self._recent_weather['main']['temp_max']
-        temp_min = self._recent_weather['main']['temp_min']
-        feels_like = self._recent_weather['main']['feels_like']
-        desc = self._recent_weather['weather'][0]['description']
-        wind = self._recent_weather['wind']['speed']
-        clouds = self._recent_weather['clouds']['all']
-
-        temp_str = f"{temp}±{(temp_max - temp_min):.1f}"
-
-        forecast_dict = {
-            "temperature": temp,
-            "temp_margin": temp_max - temp_min,
-            "feels_like": feels_like,
-            "weather": desc,
-            "wind_speed": wind,
-            "cloud_cover": clouds
-        }
-
-        return forecast_dict
-
-        # return (
-        #     f"Temperature: {temp_str} °C, fl. {feels_like} °C\n"
-        #     f"Weather: {desc}\n"
-        #     f"Wind Speed: {wind} m/s\n"
-        #     f"Cloud Cover: {clouds}%"
-        # )
+        return parse_weather(self._recent_weather)
 
     def _load_cached_weather(self):
         if os.path.exists(self._weather_cache_file):
@@ -156,6 +185,207 @@ class Weather:
         return datetime.fromtimestamp(self._recent_weather["sys"]["sunset"], tz=IRELAND_TZ)
     
 
+class WeatherClient:
+    """
+    Async OpenWeatherMap client, meant to be shared for the life of the bot.
+
+    One keep-alive aiohttp session is reused for every request. Each request
+    has a timeout and is retried with exponential backoff on network errors,
+    429s and 5xx responses. Concurrent calls for the same (endpoint, lat, lon)
+    share a single in-flight fetch. base_url can point at a local stub server.
+    """
+
+    def __init__(self, base_url: str = OPENWEATHER_URL, api_key: str = API_KEY,
+                 timeout: float = 10, retries: int = 3, backoff: float = 0.5, max_connections: int = 10):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_connections = max_connections
+        self._session = None
+        self._inflight = {}
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def _fetch_with_retry(self, endpoint: str, lat: float, lon: float):
+        params = {
+            "lat": lat,
+            "lon": lon,
+            "appid": self.api_key,
+            "units": "metric"
+        }
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                async with self._get_session().get(self.base_url + endpoint, params=params) as response:
+                    if response.status == 200:
+                        return await response.json()
+                    last_error = RuntimeError(f"API request failed (status {response.status}): {await response.text()}")
+                    if response.status != 429 and response.status < 500:
+                        break  # not worth retrying
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = e
+        raise last_error
+
+    async def fetch(self, endpoint: str, lat: float, lon: float):
+        """GET an OpenWeatherMap endpoint ("weather" or "forecast") and return the JSON payload."""
+        key = (endpoint, lat, lon)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_with_retry(endpoint, lat, lon))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield so one caller being cancelled doesn't cancel the fetch for the rest
+        return await asyncio.shield(task)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class WeatherCache:
+    """
+    TTL cache in front of a WeatherClient, keyed by (endpoint, lat, lon).
+
+    Entries live in memory and are mirrored to one JSON file per key under
+    cache_dir, so a restart (or a failed fetch) still has something to serve.
+    Fresh entries are returned as is. Entries past their TTL but younger than
+    max_stale are returned immediately while a background task refreshes them.
+    Anything older, or anything asked for with refresh=True, is refetched
+    before returning. stats counts what happened.
+    """
+
+    DEFAULT_TTL = {"weather": 10 * 60, "forecast": 30 * 60}
+
+    def __init__(self, client: WeatherClient, ttl: dict = None, max_stale: float = 24 * 3600, cache_dir: str = "weather_cache"):
+        self.client = client
+        self.ttl = {**self.DEFAULT_TTL, **(ttl or {})}
+        self.max_stale = max_stale
+        self.cache_dir = cache_dir
+        self._entries = {}  # key -> (fetched_at, payload)
+        self._refreshing = {}
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "errors": 0}
+
+    def _path(self, key):
+        endpoint, lat, lon = key
+        return os.path.join(self.cache_dir, f"{endpoint}_{lat:.4f}_{lon:.4f}.json")
+
+    def _load_disk(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                saved = json.load(f)
+            entry = (saved["fetched_at"], saved["payload"])
+        except (OSError, ValueError, KeyError):
+            return None
+        self._entries[key] = entry
+        return entry
+
+    def _store(self, key, payload):
+        entry = (time.time(), payload)
+        self._entries[key] = entry
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = self._path(key) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"fetched_at": entry[0], "payload": payload}, f)
+        os.replace(tmp, self._path(key))
+
+    async def _refresh(self, key):
+        payload = await self.client.fetch(*key)
+        self.stats["refreshes"] += 1
+        self._store(key, payload)
+        return payload
+
+    def _refresh_in_background(self, key):
+        if key in self._refreshing:
+            return
+
+        def done(task):
+            self._refreshing.pop(key, None)
+            if not task.cancelled() and task.exception() is not None:
+                self.stats["errors"] += 1
+                print(f"⚠️ Background weather refresh failed: {task.exception()}")
+
+        task = asyncio.ensure_future(self._refresh(key))
+        self._refreshing[key] = task
+        task.add_done_callback(done)
+
+    def forget(self, lat: float, lon: float):
+        """Drop a location's entries from memory; its files stay as a fallback."""
+        for key in [k for k in self._entries if k[1:] == (lat, lon)]:
+            del self._entries[key]
+
+    def fetched_at(self, endpoint: str, lat: float, lon: float):
+        """Epoch seconds the cached payload was fetched, or None if there isn't one."""
+        key = (endpoint, lat, lon)
+        entry = self._entries.get(key) or self._load_disk(key)
+        return entry[0] if entry is not None else None
+
+    async def get(self, endpoint: str, lat: float, lon: float, refresh: bool = False):
+        """Cached payload. refresh=True skips the fresh and stale paths and fetches now (the cache is still the fallback)."""
+        key = (endpoint, lat, lon)
+        entry = self._entries.get(key) or self._load_disk(key)
+
+        if entry is not None and not refresh:
+            age = time.time() - entry[0]
+            if age < self.ttl.get(endpoint, 0):
+                self.stats["hits"] += 1
+                return entry[1]
+            if age < self.max_stale:
+                self.stats["stale_hits"] += 1
+                self._refresh_in_background(key)
+                return entry[1]
+
+        self.stats["misses"] += 1
+        try:
+            return await self._refresh(key)
+        except Exception as e:
+            self.stats["errors"] += 1
+            if entry is None:
+                raise RuntimeError(f"No cached {endpoint} available.") from e
+            print(f"⚠️ {e}, serving {endpoint} from cache.")
+            return entry[1]
+
+
+class AsyncWeather(Weather):
+    """Weather with non-blocking, cached fetches through a shared WeatherCache."""
+
+    def __init__(self, cache: WeatherCache):
+        super().__init__()
+        self.cache = cache
+
+    async def forecast(self, refresh: bool = False):
+        self._recent_forecast = await self.cache.get("forecast", self.lat, self.lon, refresh=refresh)
+        return self._recent_forecast
+
+    async def weather_at(self, target_dt, interpolate: bool = False) -> tuple[datetime, dict]:
+        return forecast_entry_at(await self.forecast(), target_dt, interpolate)
+
+    async def weather_at_many(self, targets, interpolate: bool = False) -> list[tuple[datetime, dict]]:
+        return forecast_series(await self.forecast()).batch(targets, interpolate)
+
+    async def weather_now(self):
+        self._recent_weather = await self.cache.get("weather", self.lat, self.lon)
+        return parse_weather(self._recent_weather)
+
+    async def sunset(self):
+        if self._recent_weather is None:
+            await self.weather_now()
+        return datetime.fromtimestamp(self._recent_weather["sys"]["sunset"], tz=IRELAND_TZ)
+
+
 # Run
 if __name__ == "__main__":
     weather = Weather()